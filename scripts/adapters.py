@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Source Adapter Framework
+Registry of odds sources, each with its own endpoints, rate limit, timeout,
+parser and concurrency budget, run behind a circuit breaker in a worker pool
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+HEALTH_FILE = Path(__file__).parent.parent / "analysis" / "adapter_health.json"
+
+ADAPTERS = {}
+
+
+class CircuitBreaker:
+    """
+    Classic closed → open → half-open breaker
+
+    After `failure_threshold` consecutive failures the breaker opens and the
+    source is skipped until `reset_timeout` seconds have passed; then one
+    trial run is allowed (half-open) and its result closes or re-opens it.
+    While that trial is in flight the breaker reports 'trial' and refuses
+    every other call; a trial that never reports back lapses after another
+    `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=15 * 60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        now = time.time()
+        if self.trial_at is not None and now - self.trial_at < self.reset_timeout:
+            return 'trial'
+        if now - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        """Return True if a call may go through; in half-open only the first caller gets through"""
+        with self._lock:
+            state = self.state
+            if state == 'half-open':
+                self.trial_at = time.time()
+            return state in ('closed', 'half-open')
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.time()
+            self.trial_at = None
+
+    def to_dict(self):
+        return {'failures': self.failures, 'opened_at': self.opened_at}
+
+    def load(self, state):
+        self.failures = state.get('failures', 0)
+        self.opened_at = state.get('opened_at')
+
+
+class RateLimiter:
+    """Enforce a minimum interval between requests to one source"""
+
+    def __init__(self, min_interval=0.0):
+        self.min_interval = min_interval
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next_allowed - now)
+            self._next_allowed = max(now, self._next_allowed) + self.min_interval
+        if delay:
+            time.sleep(delay)
+
+
+class SourceAdapter:
+    """
+    One odds source
+
+    endpoints   {sport: url} — '*' is a fallback template formatted with {sport}
+    parser      parser(payload, sport) -> list of records
+    params      query params sent with every request
+    rate_limit  minimum seconds between requests to this source
+    timeout     per-request timeout (also the worker deadline)
+    concurrency number of worker slots this source may occupy
+    fallback    fallback(sport) -> records used when the source fails or is open
+    """
+
+    def __init__(self, name, endpoints, parser, params=None, rate_limit=0.0, timeout=10,
+                 concurrency=1, fallback=None, breaker=None):
+        self.name = name
+        self.endpoints = endpoints
+        self.parser = parser
+        self.params = params or {}
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.fallback = fallback
+        self.limiter = RateLimiter(rate_limit)
+        self.breaker = breaker or CircuitBreaker()
+        self.slots = threading.BoundedSemaphore(concurrency)
+
+    def endpoint_for(self, sport):
+        if sport in self.endpoints:
+            return self.endpoints[sport]
+        if '*' in self.endpoints:
+            return self.endpoints['*'].format(sport=sport)
+        return None
+
+    def fetch(self, sport, params=None, **parse_options):
+        """
+        Fetch and parse one sport; raises on HTTP or parse failure
+
+        `params` are merged over the adapter's own for this request only, and
+        `parse_options` (e.g. limit=None) are passed through to the parser.
+        """
+        url = self.endpoint_for(sport)
+        if url is None:
+            return []
+        with self.slots:
+            self.limiter.acquire()
+            response = requests.get(url, params={**self.params, **(params or {})}, timeout=self.timeout)
+            response.raise_for_status()
+            return self.parser(response.json(), sport, **parse_options)
+
+
+def register_adapter(adapter):
+    """Add an adapter to the registry (replacing any with the same name)"""
+    ADAPTERS[adapter.name] = adapter
+    return adapter
+
+
+def load_breaker_state(adapters, path=HEALTH_FILE):
+    """Restore breaker state saved by the previous scan"""
+    if not path.exists():
+        return
+    try:
+        with open(path) as f:
+            saved = json.load(f).get('breakers', {})
+    except (OSError, ValueError):
+        return
+    for adapter in adapters:
+        if adapter.name in saved:
+            adapter.breaker.load(saved[adapter.name])
+
+
+def save_health(adapters, health, path=HEALTH_FILE):
+    """Persist breaker state and this run's health report"""
+    path.parent.mkdir(exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({
+            'updated_at': datetime.now().isoformat(),
+            'breakers': {a.name: a.breaker.to_dict() for a in adapters},
+            'last_run': health
+        }, f, indent=2)
+
+
+def _use_fallback(adapter, sport):
+    return adapter.fallback(sport) if adapter.fallback else []
+
+
+def _timed(started, key, fn, *args, **kwargs):
+    """Run fn in a worker, noting when it actually left the queue"""
+    started[key] = time.monotonic()
+    return fn(*args, **kwargs)
+
+
+def run_adapters(sports, adapters=None, persist=True, parse_options=None):
+    """
+    Run every adapter for every sport, each adapter in its own worker pool
+
+    `parse_options` is {adapter name: parser keyword arguments}.
+
+    Returns (results, health) where results is {sport: {adapter_name: records}}
+    and health is a list of per-(adapter, sport) status dicts.
+    """
+    adapters = list(ADAPTERS.values()) if adapters is None else adapters
+    parse_options = parse_options or {}
+    if persist:
+        load_breaker_state(adapters)
+
+    results = {sport: {} for sport in sports}
+    health = []
+    jobs = {}
+    started = {}    # (adapter name, sport) -> when a worker picked the job up
+    finished = {}
+
+    # Each adapter gets its own pool sized to its concurrency budget, so a
+    # hanging source can only ever tie up its own slots
+    pools = {a.name: ThreadPoolExecutor(max_workers=a.concurrency, thread_name_prefix=f'adapter-{a.name}')
+             for a in adapters}
+    deadline = 1.0
+
+    for adapter in adapters:
+        runnable = []
+        for sport in sports:
+            if not adapter.breaker.allow():
+                results[sport][adapter.name] = _use_fallback(adapter, sport)
+                health.append({'adapter': adapter.name, 'sport': sport, 'status': 'skipped',
+                               'breaker': adapter.breaker.state, 'records': len(results[sport][adapter.name]),
+                               'elapsed_ms': 0, 'error': None})
+                continue
+            runnable.append(sport)
+            future = pools[adapter.name].submit(_timed, started, (adapter.name, sport), adapter.fetch, sport,
+                                                **parse_options.get(adapter.name, {}))
+            future.add_done_callback(lambda f: finished.setdefault(f, time.monotonic()))
+            jobs[future] = (adapter, sport)
+
+        # Worst case for this adapter: every batch of slots runs to its timeout
+        batches = -(-len(runnable) // adapter.concurrency)
+        deadline = max(deadline, batches * (adapter.timeout + adapter.limiter.min_interval) + 1)
+
+    done, not_done = wait(jobs, timeout=deadline)
+    for pool in pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    for future, (adapter, sport) in jobs.items():
+        # Request time only: a job still queued behind the concurrency budget reports 0
+        began = started.get((adapter.name, sport))
+        elapsed_ms = round((finished.get(future, time.monotonic()) - began) * 1000, 1) if began is not None else 0
+        error = None
+        if future in not_done:
+            error = f"no response within {deadline:.0f}s"
+        elif future.exception() is not None:
+            error = str(future.exception())
+
+        if error is None:
+            adapter.breaker.record_success()
+            records = future.result()
+            status = 'ok'
+        else:
+            adapter.breaker.record_failure()
+            records = _use_fallback(adapter, sport)
+            status = 'timeout' if future in not_done else 'error'
+
+        results[sport][adapter.name] = records
+        health.append({'adapter': adapter.name, 'sport': sport, 'status': status,
+                       'breaker': adapter.breaker.state, 'records': len(records),
+                       'elapsed_ms': elapsed_ms, 'error': error})
+
+    if persist:
+        save_health(adapters, health)
+
+    return results, health
+
+
+def print_health(health):
+    """Print a one-line status per adapter run"""
+    icons = {'ok': '✓', 'error': '❌', 'timeout': '⏱️ ', 'skipped': '⏭️ '}
+    print(f"\n🩺 Adapter health")
+    for h in sorted(health, key=lambda h: (h['sport'], h['adapter'])):
+        line = f"  {icons.get(h['status'], '?')} {h['adapter']} ({h['sport'].upper()}): {h['status']}, " \
+               f"{h['records']} records, {h['elapsed_ms']}ms, breaker {h['breaker']}"
+        if h['error']:
+            line += f" — {h['error']}"
+        print(line)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Snapshot Archive
+Splits each scraper snapshot into per-event chunks stored once by hash, and
+records every scan as a small manifest of chunk hashes
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+ANALYSIS_DIR = Path(__file__).parent.parent / "analysis"
+ARCHIVE_DIR = ANALYSIS_DIR / "archive"
+
+# Records with no event (fallbacks, promos) share one chunk per source
+NO_EVENT = ''
+
+
+def _record_event(record):
+    return record.get('event') or record.get('game') or NO_EVENT
+
+
+def _encode(records):
+    """Canonical bytes for a chunk, so identical content hashes identically"""
+    return json.dumps(records, sort_keys=True, separators=(',', ':')).encode()
+
+
+def _chunk_path(digest, chunk_dir):
+    return chunk_dir / digest[:2] / f"{digest}.json.gz"
+
+
+def _write_once(path, payload):
+    """Write a file atomically unless it already exists; returns bytes written"""
+    if path.exists():
+        return 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp, path)
+    return len(payload)
+
+
+def split_chunks(data):
+    """
+    Yield (sport, source, event, records) for every per-event chunk of a
+    snapshot's `data` section, in first-seen order
+    """
+    for sport, sources in data.get('sources', {}).items():
+        for source, records in sources.items():
+            groups = {}
+            for record in records:
+                groups.setdefault(_record_event(record), []).append(record)
+            for event, group in groups.items():
+                yield sport, source, event, group
+
+
+def save_snapshot(data, captured_at=None, archive_dir=ARCHIVE_DIR):
+    """
+    Archive one scraper snapshot; returns (manifest_path, stats)
+
+    Only chunks not already in the store are written. Everything in `data`
+    other than `sources` is small per-scan metadata and lives in the manifest.
+    """
+    captured_at = captured_at or datetime.now().isoformat()
+    chunk_dir = archive_dir / "chunks"
+    stats = {'chunks': 0, 'new_chunks': 0, 'bytes_written': 0}
+    chunks = []
+
+    for sport, source, event, records in split_chunks(data):
+        payload = _encode(records)
+        digest = hashlib.sha256(payload).hexdigest()
+        written = _write_once(_chunk_path(digest, chunk_dir), gzip.compress(payload, mtime=0))
+        stats['chunks'] += 1
+        stats['new_chunks'] += 1 if written else 0
+        stats['bytes_written'] += written
+        chunks.append({'sport': sport, 'source': source, 'event': event, 'hash': digest})
+
+    manifest = {
+        'captured_at': captured_at,
+        'meta': {k: v for k, v in data.items() if k != 'sources'},
+        'sources': {sport: list(sources) for sport, sources in data.get('sources', {}).items()},
+        'chunks': chunks
+    }
+    stamp = datetime.fromisoformat(captured_at)
+    manifest_path = archive_dir / "manifests" / stamp.strftime('%Y%m%d') / f"{stamp.strftime('%H%M%S_%f')}.json"
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = json.dumps(manifest, separators=(',', ':')).encode()
+    with open(manifest_path, 'wb') as f:
+        f.write(payload)
+    stats['bytes_written'] += len(payload)
+
+    return manifest_path, stats
+
+
+def read_chunk(digest, archive_dir=ARCHIVE_DIR):
+    """Decompress and decode one chunk"""
+    with gzip.open(_chunk_path(digest, archive_dir / "chunks"), 'rb') as f:
+        return json.loads(f.read())
+
+
+def load_manifest(manifest_path, sports=None, sources=None, events=None, archive_dir=None):
+    """
+    Rebuild a snapshot from its manifest, in the scraper's file format
+
+    `sports`, `sources` and `events` restrict which chunks are read; chunks
+    outside the filter are never opened.
+    """
+    manifest_path = Path(manifest_path)
+    archive_dir = archive_dir or manifest_path.parent.parent.parent
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    data = dict(manifest['meta'])
+    data['sources'] = {}
+    for sport, source_names in manifest['sources'].items():
+        if sports is None or sport in sports:
+            data['sources'][sport] = {name: [] for name in source_names
+                                      if sources is None or name in sources}
+
+    for chunk in manifest['chunks']:
+        if chunk['sport'] not in data['sources']:
+            continue
+        if sources is not None and chunk['source'] not in sources:
+            continue
+        if events is not None and chunk['event'] not in events:
+            continue
+        data['sources'][chunk['sport']][chunk['source']].extend(read_chunk(chunk['hash'], archive_dir))
+
+    return {'captured_at': manifest['captured_at'], 'data': data}
+
+
+def list_snapshots(since=None, until=None, archive_dir=ARCHIVE_DIR, include_legacy=True):
+    """
+    Every snapshot (archive manifests and legacy sportsbook_data_*.json files)
+    as (captured_at datetime, path), oldest first
+    """
+    found = []
+
+    for manifest in (archive_dir / "manifests").glob("*/*.json"):
+        stamp = datetime.strptime(f"{manifest.parent.name}{manifest.stem}", '%Y%m%d%H%M%S_%f')
+        found.append((stamp, manifest))
+
+    if include_legacy:
+        for legacy in archive_dir.parent.glob("sportsbook_data_*.json"):
+            try:
+                stamp = datetime.strptime('_'.join(legacy.stem.split('_')[2:4]), '%Y%m%d_%H%M%S')
+            except ValueError:
+                continue
+            found.append((stamp, legacy))
+
+    return sorted((s, p) for s, p in found
+                  if (since is None or s >= since) and (until is None or s <= until))
+
+
+def load_snapshot(path, **filters):
+    """
+    Read any snapshot path: an archive manifest or a legacy full JSON copy
+    """
+    path = Path(path)
+    if path.parent.parent.name == "manifests":
+        return load_manifest(path, **filters)
+    with open(path) as f:
+        return json.load(f)
+
+
+def latest_snapshot(archive_dir=ARCHIVE_DIR):
+    """Path of the newest snapshot in either format, or None"""
+    snapshots = list_snapshots(archive_dir=archive_dir)
+    return snapshots[-1][1] if snapshots else None
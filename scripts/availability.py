@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Jurisdiction and Account Availability
+Compiles which books are legal in each state, and what each of our accounts
+can actually stake there, into per-book bitmasks and numeric bounds. The
+detector uses them to drop (bonus book, hedge book, stake) combinations
+nobody can place before running any arb math.
+
+Config (JSON):
+    {
+      "states": {"NJ": ["DraftKings", "FanDuel", "BetMGM"], "NY": ["DraftKings", "Caesars"]},
+      "accounts": [
+        {"name": "sam-nj", "state": "NJ",
+         "books": {"DraftKings": {"balance": 800, "max_stake": 2000, "bonus": 250},
+                   "FanDuel": {"balance": 1200}}}
+      ]
+    }
+
+`bonus` is the bonus credit held at that book (0 if omitted). `balance` and
+`max_stake` are unbounded when omitted.
+"""
+
+import json
+
+import numpy as np
+
+from sensitivity import american_to_decimal_array
+
+# One bit per book in a uint64, with the top bit left for books outside the config
+MAX_BOOKS = 63
+
+
+def compile_availability(config):
+    """
+    Bitmasks and bounds for every account, over every book the config names
+
+    Returns a dict of:
+        books        book names; position = bit
+        accounts     account names; position = row
+        bonus_mask   (accounts,) uint64: books where the account holds a usable bonus
+        hedge_mask   (accounts,) uint64: books where the account can stake real money
+        bonus        (accounts, books + 1): bonus stake available per book
+        hedge_cap    (accounts, books + 1): largest real-money stake per book
+    """
+    states = config.get('states', {})
+    accounts = config.get('accounts', [])
+    books = sorted({b for legal in states.values() for b in legal} |
+                   {b for account in accounts for b in account.get('books', {})})
+    if len(books) > MAX_BOOKS:
+        raise ValueError(f"Availability config names {len(books)} books; at most {MAX_BOOKS} are supported")
+    bit = {book: i for i, book in enumerate(books)}
+
+    bonus = np.zeros((len(accounts), len(books) + 1))
+    hedge_cap = np.zeros((len(accounts), len(books) + 1))
+    bonus_mask, hedge_mask = [], []
+
+    for row, account in enumerate(accounts):
+        name = account.get('name', f"account-{row}")
+        if account.get('state') not in states:
+            raise ValueError(f"Account {name}: unknown state {account.get('state')!r}")
+        legal = set(states[account['state']])
+        bonus_bits = hedge_bits = 0
+
+        for book, limits in account.get('books', {}).items():
+            if book not in legal:
+                continue
+            i = bit[book]
+            max_stake = limits.get('max_stake', np.inf)
+            bonus[row, i] = min(limits.get('bonus', 0), max_stake)
+            hedge_cap[row, i] = min(limits.get('balance', np.inf), max_stake)
+            if bonus[row, i] > 0:
+                bonus_bits |= 1 << i
+            if hedge_cap[row, i] > 0:
+                hedge_bits |= 1 << i
+
+        bonus_mask.append(bonus_bits)
+        hedge_mask.append(hedge_bits)
+
+    return {
+        'books': books,
+        'accounts': [a.get('name', f"account-{i}") for i, a in enumerate(accounts)],
+        'bonus_mask': np.array(bonus_mask, dtype=np.uint64),
+        'hedge_mask': np.array(hedge_mask, dtype=np.uint64),
+        'bonus': bonus,
+        'hedge_cap': hedge_cap
+    }
+
+
+def load_availability(path):
+    """Read and compile an availability config file"""
+    with open(path) as f:
+        return compile_availability(json.load(f))
+
+
+def _book_ids(availability, books):
+    """Bit position per book; books outside the config get the spare top bit"""
+    unknown = len(availability['books'])
+    bit = {book: i for i, book in enumerate(availability['books'])}
+    return np.array([bit.get(b, unknown) for b in books], dtype=np.int64)
+
+
+def _has_bit(masks, ids):
+    """(accounts × len(ids)) whether each account's mask has each book's bit"""
+    return ((masks[:, None] >> ids.astype(np.uint64)[None, :]) & np.uint64(1)).astype(bool)
+
+
+def expand(availability, groups, bonus_books, hedge_books, bonus_odds, hedge_odds):
+    """
+    (pair position, account name, bonus stake) for every feasible combination
+
+    The inputs are flat (bonus quote, opposite quote) pairs; `groups` numbers
+    the bonus quote each pair belongs to, increasing with position. For every
+    group and account the hedge is the best-priced opposite quote at a book
+    where the account can place it — legal, funded, and with balance and max
+    stake covering the hedge the bonus needs — so a better price at a book
+    the account cannot use, or cannot fund, never hides a feasible one. Rows
+    come out group-major, in account order within a group.
+    """
+    if not len(groups):
+        return []
+    groups = np.asarray(groups)
+    bonus_ids = _book_ids(availability, bonus_books)
+    hedge_ids = _book_ids(availability, hedge_books)
+    hedge_decimal = american_to_decimal_array(hedge_odds)
+
+    usable = _has_bit(availability['bonus_mask'], bonus_ids) & _has_bit(availability['hedge_mask'], hedge_ids)
+    stakes = availability['bonus'][:, bonus_ids]
+    # Hedge per $1 of bonus, as sized by calculate_bonus_arb
+    ratio = (american_to_decimal_array(bonus_odds) - 1) / (hedge_decimal - 1)
+    usable &= stakes * ratio[None, :] <= availability['hedge_cap'][:, hedge_ids]
+
+    # Pairs by group, best hedge price first (ties keep input order)
+    order = np.lexsort((-hedge_decimal, groups))
+    ordered_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, ordered_groups[1:] != ordered_groups[:-1]])
+    # First feasible pair per (account, group) in that order; len(order) where none is
+    rank = np.where(usable[:, order], np.arange(len(order)), len(order))
+    first = np.minimum.reduceat(rank, starts, axis=1)
+    found = first < len(order)
+    chosen = order[np.minimum(first, len(order) - 1)]
+    stakes = np.take_along_axis(stakes, chosen, axis=1)
+
+    names = availability['accounts']
+    return [(int(chosen[a, g]), names[a], _amount(stakes[a, g])) for g, a in zip(*np.nonzero(found.T))]
+
+
+def _amount(value):
+    """Plain int for whole-dollar stakes, so descriptions read '$250' not '$250.0'"""
+    value = float(value)
+    return int(value) if value.is_integer() else round(value, 2)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Bonus Conversion Backtester
+Replays archived snapshots in time order through the detection math and
+reports per-policy P&L and opportunity capture, one process per date range
+"""
+
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from archive import ANALYSIS_DIR, list_snapshots, load_snapshot
+from quotes import LineIndex, normalize_quotes, quote_label
+from sensitivity import bonus_arb_batch
+
+RAW_DIR = Path(__file__).parent.parent / "raw"
+
+# Only these sources carry priced quotes, so archive reads skip the rest
+QUOTE_SOURCES = ('aggregated_odds_api', 'espn')
+
+POLICY_DEFAULTS = {
+    'name': 'default',
+    'min_odds': -10000,         # Lowest American odds allowed on the bonus leg
+    'min_roi': 0.0,             # % on real money at risk
+    'bankroll': 5000.0,         # Real money that can be at risk in one day
+    'books': None,              # Allowed bonus/hedge books (None = all)
+    'bonus_amount': 1000.0,
+    'conversions_per_day': 1    # Bonuses converted per bonus book per day
+}
+
+DEFAULT_POLICIES = [
+    {'name': 'any-positive'},
+    {'name': 'min-odds-200', 'min_odds': -200, 'min_roi': 2.0},
+    {'name': 'small-bankroll', 'bankroll': 1500.0, 'min_roi': 5.0},
+]
+
+
+def make_policy(spec):
+    """Fill a policy spec out with defaults"""
+    policy = dict(POLICY_DEFAULTS)
+    policy.update(spec)
+    if policy['books'] is not None:
+        policy['books'] = set(policy['books'])
+    return policy
+
+
+def candidate_key(event, bonus_label, bonus_book):
+    """
+    Identity of an opportunity across snapshots and raw detector dumps, so
+    one seen in both is only counted (and bet) once; the selection label
+    already carries market and point, e.g. 'Boston Celtics -5.5'
+    """
+    return (event, bonus_label, bonus_book)
+
+
+def snapshot_candidates(data):
+    """
+    Flatten a snapshot's quote index into candidate arrays
+
+    One candidate per (line, side, bonus book), hedged at the best opposite
+    price elsewhere — the same pairing detector.build_candidates makes.
+    """
+    index = LineIndex(normalize_quotes(data))
+    bonus_odds, hedge_odds, bonus_books, hedge_books, keys = [], [], [], [], []
+
+    for quote, hedge in index.hedge_pairs():
+        bonus_odds.append(quote['price'])
+        hedge_odds.append(hedge['price'])
+        bonus_books.append(quote['book'])
+        hedge_books.append(hedge['book'])
+        keys.append(candidate_key(quote['event'], quote_label(quote), quote['book']))
+
+    return np.array(bonus_odds, dtype=float), np.array(hedge_odds, dtype=float), bonus_books, hedge_books, keys
+
+
+def raw_candidates(opportunities):
+    """Candidate arrays from a saved arb_opportunities_*.json list"""
+    pairs = [(o, o['calculation']) for o in opportunities if 'calculation' in o]
+    return (
+        np.array([c['bonus_odds'] for _, c in pairs], dtype=float),
+        np.array([c['hedge_odds'] for _, c in pairs], dtype=float),
+        [c['bonus_book'] for _, c in pairs],
+        [c['hedge_book'] for _, c in pairs],
+        [candidate_key(o.get('event') or o.get('description'), c['bonus_team'], c['bonus_book'])
+         for o, c in pairs]
+    )
+
+
+def _load_candidates(kind, path):
+    if kind == 'raw':
+        with open(path) as f:
+            return raw_candidates(json.load(f))
+    snapshot = load_snapshot(path, sources=QUOTE_SOURCES)
+    return snapshot_candidates(snapshot.get('data', {}))
+
+
+def _empty_stats():
+    return {'snapshots': 0, 'qualifying': 0, 'bets': 0, 'profit': 0.0, 'risk': 0.0}
+
+
+def run_range(job):
+    """
+    Replay one date range (whole days, oldest first) for every policy
+
+    Bonus conversions, bankroll use and already-taken opportunities reset at
+    each day boundary, so ranges are independent and can run in parallel.
+    """
+    snapshots, policy_specs = job
+    policies = [make_policy(p) for p in policy_specs]
+    totals = {p['name']: _empty_stats() for p in policies}
+    daily = {}
+    day = None
+
+    for stamp, kind, path in snapshots:
+        if stamp[:10] != day:
+            day = stamp[:10]
+            state = {p['name']: {'taken': set(), 'seen': set(), 'conversions': {}, 'risk': 0.0}
+                     for p in policies}
+
+        bonus_odds, hedge_odds, bonus_books, hedge_books, keys = _load_candidates(kind, Path(path))
+        if not len(bonus_odds):
+            for p in policies:
+                totals[p['name']]['snapshots'] += 1
+            continue
+
+        # Unit-bonus math once per snapshot; every policy just scales it
+        unit_hedge, unit_profit, roi = bonus_arb_batch(np.ones(len(bonus_odds)), bonus_odds, hedge_odds)
+
+        for p in policies:
+            name = p['name']
+            stats, st = totals[name], state[name]
+            day_stats = daily.setdefault(day, {}).setdefault(name, _empty_stats())
+            stats['snapshots'] += 1
+            day_stats['snapshots'] += 1
+
+            mask = (bonus_odds >= p['min_odds']) & (roi >= p['min_roi']) & (unit_profit > 0)
+            if p['books'] is not None:
+                allowed = p['books']
+                mask &= np.array([b in allowed and h in allowed for b, h in zip(bonus_books, hedge_books)])
+
+            hits = np.nonzero(mask)[0]
+            for i in hits[np.argsort(-unit_profit[hits], kind='stable')]:
+                key = keys[i]
+                if key not in st['seen']:
+                    st['seen'].add(key)
+                    stats['qualifying'] += 1
+                    day_stats['qualifying'] += 1
+                if key in st['taken']:
+                    continue
+                book = bonus_books[i]
+                if st['conversions'].get(book, 0) >= p['conversions_per_day']:
+                    continue
+                hedge_stake = unit_hedge[i] * p['bonus_amount']
+                if st['risk'] + hedge_stake > p['bankroll']:
+                    continue
+
+                st['taken'].add(key)
+                st['conversions'][book] = st['conversions'].get(book, 0) + 1
+                st['risk'] += hedge_stake
+                for s in (stats, day_stats):
+                    s['bets'] += 1
+                    s['profit'] += float(unit_profit[i] * p['bonus_amount'])
+                    s['risk'] += float(hedge_stake)
+
+    return totals, daily
+
+
+def _raw_files(since=None, until=None):
+    found = []
+    for path in RAW_DIR.glob("arb_opportunities_*.json"):
+        match = re.search(r'(\d{8}_\d{6})', path.name)
+        if not match:
+            continue
+        stamp = datetime.strptime(match.group(1), '%Y%m%d_%H%M%S')
+        if (since is None or stamp >= since) and (until is None or stamp <= until):
+            found.append((stamp, path))
+    return found
+
+
+def backtest(policies=None, since=None, until=None, workers=None, include_raw=False, days_per_job=1):
+    """
+    Replay every snapshot between `since` and `until` for each policy
+
+    Returns {'policies': {name: totals}, 'daily': {date: {name: stats}}, ...}.
+    """
+    policies = policies or DEFAULT_POLICIES
+    snapshots = [(s.isoformat(), 'snapshot', str(p)) for s, p in list_snapshots(since, until)]
+    if include_raw:
+        snapshots += [(s.isoformat(), 'raw', str(p)) for s, p in _raw_files(since, until)]
+    snapshots.sort()
+
+    by_day = {}
+    for snap in snapshots:
+        by_day.setdefault(snap[0][:10], []).append(snap)
+    days = sorted(by_day)
+    jobs = [([snap for d in days[i:i + days_per_job] for snap in by_day[d]], policies)
+            for i in range(0, len(days), days_per_job)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        results = [run_range(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_range, jobs))
+
+    totals = {make_policy(p)['name']: _empty_stats() for p in policies}
+    daily = {}
+    for range_totals, range_daily in results:
+        for name, stats in range_totals.items():
+            for field, value in stats.items():
+                totals[name][field] += value
+        daily.update(range_daily)
+
+    for stats in totals.values():
+        stats['profit'] = round(stats['profit'], 2)
+        stats['risk'] = round(stats['risk'], 2)
+        stats['roi_pct'] = round(stats['profit'] / stats['risk'] * 100, 2) if stats['risk'] else 0
+        stats['capture_rate'] = round(stats['bets'] / stats['qualifying'], 4) if stats['qualifying'] else 0
+
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'since': since.isoformat() if since else None,
+        'until': until.isoformat() if until else None,
+        'snapshots': len(snapshots),
+        'policies': totals,
+        'daily': dict(sorted(daily.items()))
+    }
+
+
+def print_backtest(result):
+    """Per-policy P&L table"""
+    print("\n" + "=" * 80)
+    print(f"📈 BACKTEST — {result['snapshots']} snapshots")
+    print("=" * 80)
+    print(f"\n{'Policy':<20} {'Bets':>6} {'Qualifying':>11} {'Capture':>8} {'Profit':>12} {'Risk':>12} {'ROI':>7}")
+    for name, s in result['policies'].items():
+        print(f"{name:<20} {s['bets']:>6} {s['qualifying']:>11} {s['capture_rate'] * 100:>7.1f}% "
+              f"${s['profit']:>11,.2f} ${s['risk']:>11,.2f} {s['roi_pct']:>6.1f}%")
+
+
+def _parse_date(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest bonus conversion policies over archived snapshots")
+    parser.add_argument('--since', help="ISO date/time to start from")
+    parser.add_argument('--until', help="ISO date/time to stop at")
+    parser.add_argument('--policies', help="JSON file with a list of policy objects")
+    parser.add_argument('--workers', type=int, help="processes to use (default: all cores)")
+    parser.add_argument('--days-per-job', type=int, default=1, help="days replayed per worker task")
+    parser.add_argument('--raw', action='store_true', help="also replay raw/arb_opportunities_*.json files")
+    args = parser.parse_args()
+
+    policies = None
+    if args.policies:
+        with open(args.policies) as f:
+            policies = json.load(f)
+
+    result = backtest(policies=policies, since=_parse_date(args.since), until=_parse_date(args.until),
+                      workers=args.workers, include_raw=args.raw, days_per_job=args.days_per_job)
+    print_backtest(result)
+
+    output_file = ANALYSIS_DIR / f"backtest_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_file.parent.mkdir(exist_ok=True)
+    with open(output_file, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\n✅ Results saved: {output_file}")
@@ -4,23 +4,33 @@ Bonus Bet Arbitrage Detector
 Finds guaranteed profit opportunities using bonus bets across sportsbooks
 """
 
+import argparse
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from pathlib import Path
 from datetime import datetime
 
-def american_to_decimal(american_odds):
-    """Convert American odds to decimal"""
-    if american_odds > 0:
-        return (american_odds / 100) + 1
-    else:
-        return (100 / abs(american_odds)) + 1
+import numpy as np
 
-def american_to_implied_prob(american_odds):
-    """Convert American odds to implied probability"""
-    if american_odds > 0:
-        return 100 / (american_odds + 100)
-    else:
-        return abs(american_odds) / (abs(american_odds) + 100)
+from archive import latest_snapshot, load_snapshot
+from availability import expand, load_availability
+from feed import FORMATS, FeedWriter
+from odds import american_to_decimal, american_to_implied_prob
+from holds import compute_holds, print_holds, save_holds
+from profiling import Profiler, profiled
+from promos import best_conversions, load_wallet, print_conversions
+from quotes import LineIndex, normalize_quotes, quote_label
+from sensitivity import (american_to_decimal_array, attach_scores, rank_by_robust_profit,
+                         score_opportunities, sensitivity_grid)
+
+DEFAULT_BONUS_AMOUNT = 1000
+# Opportunities printed to the console (all of them are saved)
+PRINT_LIMIT = 10
+# Event shards queued per worker, so one slow shard does not idle the pool
+SHARDS_PER_WORKER = 4
 
 def calculate_bonus_arb(bonus_amount, bonus_book, bonus_team, bonus_odds, 
                         hedge_book, hedge_team, hedge_odds, hedge_is_real_money=True):
@@ -33,7 +43,18 @@ def calculate_bonus_arb(bonus_amount, bonus_book, bonus_team, bonus_odds,
     
     Returns: Guaranteed profit (regardless of outcome)
     """
-    
+    numbers = bonus_arb_numbers(bonus_amount, bonus_odds, hedge_odds)
+    if numbers is None:
+        return None
+    return bonus_arb_result(bonus_amount, bonus_book, bonus_team, bonus_odds,
+                            hedge_book, hedge_team, hedge_odds, numbers)
+
+def bonus_arb_numbers(bonus_amount, bonus_odds, hedge_odds):
+    """
+    calculate_bonus_arb's rounded (hedge stake, bonus-wins profit,
+    hedge-wins profit, guaranteed profit, ROI %), or None if the hedge
+    price cannot pay out
+    """
     # Convert odds to decimal
     bonus_decimal = american_to_decimal(bonus_odds)
     hedge_decimal = american_to_decimal(hedge_odds)
@@ -64,117 +85,491 @@ def calculate_bonus_arb(bonus_amount, bonus_book, bonus_team, bonus_odds,
     # ROI % on hedge stake (the real money at risk)
     roi_pct = (guaranteed_profit / hedge_stake * 100) if hedge_stake > 0 else 0
     
+    return (round(hedge_stake, 2), round(profit_scenario1, 2), round(profit_scenario2, 2),
+            round(guaranteed_profit, 2), round(roi_pct, 2))
+
+def bonus_arb_result(bonus_amount, bonus_book, bonus_team, bonus_odds,
+                     hedge_book, hedge_team, hedge_odds, numbers):
+    """calculate_bonus_arb's result dict around bonus_arb_numbers()"""
+    hedge_stake, profit_scenario1, profit_scenario2, guaranteed_profit, roi_pct = numbers
     return {
         'bonus_book': bonus_book,
         'bonus_team': bonus_team,
         'bonus_odds': bonus_odds,
-        'bonus_stake': bonus_stake,
+        'bonus_stake': bonus_amount,
         'hedge_book': hedge_book,
         'hedge_team': hedge_team,
         'hedge_odds': hedge_odds,
-        'hedge_stake': round(hedge_stake, 2),
-        'scenario_bonus_wins': round(profit_scenario1, 2),
-        'scenario_hedge_wins': round(profit_scenario2, 2),
-        'guaranteed_profit': round(guaranteed_profit, 2),
-        'roi_pct': round(roi_pct, 2),
-        'total_real_money_risk': round(hedge_stake, 2)
+        'hedge_stake': hedge_stake,
+        'scenario_bonus_wins': profit_scenario1,
+        'scenario_hedge_wins': profit_scenario2,
+        'guaranteed_profit': guaranteed_profit,
+        'roi_pct': roi_pct,
+        'total_real_money_risk': hedge_stake
+    }
+
+def make_candidate(sport, event, market, point, bonus, hedge, bonus_amount=DEFAULT_BONUS_AMOUNT, account=None):
+    """One candidate dict; `bonus` and `hedge` are (book, team, odds)"""
+    candidate = {
+        'description': f"{bonus[0]} ${bonus_amount} Bonus → {hedge[0]} Hedge",
+        'sport': sport,
+        'event': event,
+        'market': market,
+        'point': point,
+        'bonus': {
+            'book': bonus[0],
+            'amount': bonus_amount,
+            'team': bonus[1],
+            'odds': bonus[2]
+        },
+        'hedge': {
+            'book': hedge[0],
+            'team': hedge[1],
+            'odds': hedge[2]
+        }
+    }
+    if account is not None:
+        candidate['description'] = f"{account}: {candidate['description']}"
+        candidate['account'] = account
+    return candidate
+
+def candidate_rows(index, bonus_amount=DEFAULT_BONUS_AMOUNT, availability=None):
+    """
+    (quote, hedge, bonus stake, account) for every candidate, in build order
+
+    Without an availability model every hedge pair is one row at
+    `bonus_amount`. With one, each quote becomes one row per account that can
+    place it, hedged at the best price among the books that account can stake
+    and staked at its bonus; impossible combinations never reach the arb math.
+    """
+    if availability is None:
+        return [(quote, hedge, bonus_amount, None) for quote, hedge in index.hedge_pairs()]
+    pairs, groups = [], []
+    for n, (quote, hedges) in enumerate(index.hedge_options()):
+        pairs.extend((quote, hedge) for hedge in hedges)
+        groups.extend([n] * len(hedges))
+    feasible = expand(availability, groups,
+                      [q['book'] for q, _ in pairs], [h['book'] for _, h in pairs],
+                      [q['price'] for q, _ in pairs], [h['price'] for _, h in pairs])
+    return [pairs[n] + (stake, account) for n, account, stake in feasible]
+
+def build_candidates(index, bonus_amount=DEFAULT_BONUS_AMOUNT, availability=None):
+    """
+    One candidate per (line, side, bonus book): the bonus goes on that book's
+    price and the hedge on the best opposite price at any other book
+    """
+    return [row_candidate(*row) for row in candidate_rows(index, bonus_amount, availability)]
+
+def row_candidate(quote, hedge, stake, account=None):
+    """Candidate for one (quote, hedge, bonus stake, account) row"""
+    return make_candidate(quote['sport'], quote['event'], quote['market'], quote['point'],
+                          (quote['book'], quote_label(quote), quote['price']),
+                          (hedge['book'], quote_label(hedge), hedge['price']),
+                          stake, account)
+
+def evaluate_candidates(candidates):
+    """
+    Run the bonus arb math on every candidate, then score and rank them by
+    worst-case profit under small line moves
+    """
+    opportunities = [opp for opp in map(evaluate_candidate, candidates) if opp]
+    
+    # Score every candidate against line moves / partial fills in one batch
+    score_opportunities(opportunities)
+    return rank_by_robust_profit(opportunities)
+
+def evaluate_candidate(example, numbers=None):
+    """
+    Unscored opportunity for one candidate, or None if it cannot be hedged;
+    `numbers` is its bonus_arb_numbers() when already computed
+    """
+    if numbers is None:
+        numbers = bonus_arb_numbers(example['bonus']['amount'], example['bonus']['odds'],
+                                    example['hedge']['odds'])
+        if numbers is None:
+            return None
+    result = bonus_arb_result(
+        bonus_amount=example['bonus']['amount'],
+        bonus_book=example['bonus']['book'],
+        bonus_team=example['bonus']['team'],
+        bonus_odds=example['bonus']['odds'],
+        hedge_book=example['hedge']['book'],
+        hedge_team=example['hedge']['team'],
+        hedge_odds=example['hedge']['odds'],
+        numbers=numbers
+    )
+    
+    opportunity = {
+        'description': example['description'],
+        'calculation': result,
+        'detected_at': time.time()
     }
+    for key in ('sport', 'event', 'market', 'point', 'account'):
+        if key in example:
+            opportunity[key] = example[key]
+    return opportunity
+
+def detect(snapshot, workers=None, top_k=None, availability=None):
+    """
+    Quote index and ranked opportunities for one snapshot's `data` section,
+    without printing or saving anything
+
+    With `workers`, events are sharded across that many processes; the
+    result is the same either way.
+    """
+    index = LineIndex(normalize_quotes(snapshot))
+    if workers:
+        return index, detect_sharded(index, workers=workers, top_k=top_k, availability=availability)
+    return index, evaluate_candidates(build_candidates(index, availability=availability))[:top_k]
+
+def shard_arrays(index):
+    """
+    Flatten the index's quotes into (quotes, prices, codes, books)
+
+    `quotes` lists every quote in hedge_pairs() order, which keeps each
+    (line, side) contiguous. `prices` is their (quotes,) float odds and
+    `codes` is (quotes, 3) int32: the (line, side) group — 2 × line + side,
+    so a group's opposite side is group ^ 1 — the book's position in
+    `books`, and the event's shard ordinal. Only quotes are walked here;
+    candidates are enumerated from these arrays inside the workers.
+    """
+    keys = list(index.keys())
+    sides = [index.side(key, side) for key in keys for side in (0, 1)]
+    quotes = [quote for by_book in sides for quote in by_book.values()]
+    
+    events, books = {}, {}
+    ordinals = [events.setdefault(key[:2], len(events)) for key in keys]
+    sizes = [len(by_book) for by_book in sides]
+    codes = np.empty((len(quotes), 3), dtype=np.int32)
+    codes[:, 0] = np.repeat(np.arange(len(sides)), sizes)
+    codes[:, 1] = [books.setdefault(quote['book'], len(books)) for quote in quotes]
+    codes[:, 2] = np.repeat(np.repeat(ordinals, 2), sizes)
+    prices = np.array([quote['price'] for quote in quotes], dtype=np.float64)
+    return quotes, prices, codes, list(books)
+
+def event_shards(event_ordinals, n_shards):
+    """Split event ordinals into contiguous [lo, hi) ranges of similar row counts"""
+    counts = np.bincount(event_ordinals)
+    targets = np.cumsum(counts)[-1] * np.arange(1, n_shards) / n_shards
+    bounds = np.concatenate(([0], np.searchsorted(np.cumsum(counts), targets, side='right'), [len(counts)]))
+    return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+_shard_state = {}
+
+def _init_shard_worker(prices_name, codes_name, n_quotes, n_groups, books, bonus_amount, availability):
+    """Attach to the parent's shared quote arrays once per worker process"""
+    prices_shm = shared_memory.SharedMemory(name=prices_name)
+    codes_shm = shared_memory.SharedMemory(name=codes_name)
+    codes = np.ndarray((n_quotes, 3), dtype=np.int32, buffer=codes_shm.buf)
+    prices = np.ndarray((n_quotes,), dtype=np.float64, buffer=prices_shm.buf)
+    _shard_state.update(
+        shm=(prices_shm, codes_shm),
+        prices=prices,
+        decimal=american_to_decimal_array(prices),
+        codes=codes,
+        # Group g's quotes are positions [bounds[g], bounds[g + 1])
+        bounds=np.searchsorted(codes[:, 0], np.arange(n_groups + 1)),
+        books=np.array(books, dtype=object),
+        bonus_amount=bonus_amount,
+        availability=availability
+    )
+
+def _shard_rows(positions):
+    """
+    (quote, hedge, stake, stakes, account) for the candidates of a set of
+    quotes, in candidate_rows() order: quote and hedge positions, float
+    stakes, the original stake values and account positions (-1 without
+    availability)
+    """
+    state = _shard_state
+    codes, decimal, bounds = state['codes'], state['decimal'], state['bounds']
+    groups, books = codes[positions, 0], codes[positions, 1]
+    opposite = groups ^ 1
+    
+    if state['availability'] is None:
+        # Best and second-best quote per group, ties to the earlier quote,
+        # as LineIndex.best ranks them
+        order = positions[np.lexsort((positions, -decimal[positions], groups))]
+        ranked = codes[order, 0]
+        firsts = np.flatnonzero(np.r_[True, ranked[1:] != ranked[:-1]])
+        best = np.full(len(bounds), -1)
+        second = np.full(len(bounds), -1)
+        best[ranked[firsts]] = order[firsts]
+        seconds = firsts[firsts + 1 < len(order)]
+        seconds = seconds[ranked[seconds + 1] == ranked[seconds]]
+        second[ranked[seconds]] = order[seconds + 1]
+        
+        hedges = best[opposite]
+        same_book = (hedges >= 0) & (codes[hedges, 1] == books)
+        hedges = np.where(same_book, second[opposite], hedges)
+        found = hedges >= 0
+        n = int(found.sum())
+        return (positions[found], hedges[found], np.full(n, float(state['bonus_amount'])),
+                [state['bonus_amount']] * n, np.full(n, -1))
+    
+    # Every opposite quote at another book, in hedge_options() order
+    counts = bounds[opposite + 1] - bounds[opposite]
+    quotes = np.repeat(positions, counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    hedges = np.repeat(bounds[opposite], counts) + offsets
+    other = codes[hedges, 1] != codes[quotes, 1]
+    quotes, hedges = quotes[other], hedges[other]
+    
+    availability = state['availability']
+    prices, names = state['prices'], state['books']
+    feasible = expand(availability, quotes, names[codes[quotes, 1]], names[codes[hedges, 1]],
+                      prices[quotes], prices[hedges])
+    accounts = {name: i for i, name in enumerate(availability['accounts'])}
+    pairs = np.array([n for n, _, _ in feasible], dtype=np.int64)
+    stakes = [stake for _, _, stake in feasible]
+    return (quotes[pairs], hedges[pairs], np.array(stakes, dtype=np.float64), stakes,
+            np.array([accounts[account] for _, account, _ in feasible], dtype=np.int64))
+
+def _detect_shard(task):
+    """
+    Top-K candidate rows for one range of events, ranked within the shard
+
+    Candidates are enumerated and scored here from the shared quote arrays;
+    only compact columns go back to the parent, which builds dicts for the
+    rows that survive the merge.
+    """
+    lo, hi, top_k = task
+    state = _shard_state
+    events = state['codes'][:, 2]
+    quotes, hedges, amounts, stakes, accounts = _shard_rows(np.flatnonzero((events >= lo) & (events < hi)))
+    
+    prices = state['prices']
+    numbers = [bonus_arb_numbers(stake, bonus, hedge)
+               for stake, bonus, hedge in zip(stakes, prices[quotes].tolist(), prices[hedges].tolist())]
+    # evaluate_candidates drops the rows the arb math has no answer for
+    hedgeable = np.array([i for i, n in enumerate(numbers) if n is not None], dtype=np.int64)
+    quotes, hedges, amounts, accounts = quotes[hedgeable], hedges[hedgeable], amounts[hedgeable], accounts[hedgeable]
+    
+    grid, _ = sensitivity_grid(amounts, prices[quotes], prices[hedges])
+    flat = grid.reshape(len(quotes), -1)
+    # Rounded exactly as score_opportunities stores them
+    robust = np.array([round(float(w), 2) for w in flat.min(axis=1)])
+    upside = np.array([round(float(b), 2) for b in flat.max(axis=1)])
+    
+    keep = np.argsort(-robust, kind='stable')[:top_k]
+    return (quotes[keep], hedges[keep], accounts[keep], robust[keep], upside[keep],
+            [(stakes[hedgeable[i]], numbers[hedgeable[i]]) for i in keep])
+
+def detect_sharded(index, workers=None, top_k=None, bonus_amount=DEFAULT_BONUS_AMOUNT, availability=None):
+    """
+    evaluate_candidates(build_candidates(index))[:top_k], sharded by event
+    across a process pool
+
+    Quote prices and codes live in shared memory; each worker enumerates and
+    scores its events' candidates and returns its top K as plain columns.
+    The parent merges them on (worst-case profit, candidate order) — the
+    same order the serial path's stable sort produces — and builds dicts
+    only for the rows it returns.
+    """
+    quotes, prices, codes, books = shard_arrays(index)
+    if not len(quotes):
+        return []
+    workers = workers or os.cpu_count() or 1
+    shards = event_shards(codes[:, 2], workers * SHARDS_PER_WORKER)
+    
+    prices_shm = shared_memory.SharedMemory(create=True, size=prices.nbytes)
+    codes_shm = shared_memory.SharedMemory(create=True, size=codes.nbytes)
+    try:
+        np.ndarray(prices.shape, dtype=prices.dtype, buffer=prices_shm.buf)[:] = prices
+        np.ndarray(codes.shape, dtype=codes.dtype, buffer=codes_shm.buf)[:] = codes
+        initargs = (prices_shm.name, codes_shm.name, len(quotes), 2 * len(index), books,
+                    bonus_amount, availability)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker,
+                                 initargs=initargs) as pool:
+            results = list(pool.map(_detect_shard, [(lo, hi, top_k) for lo, hi in shards]))
+    finally:
+        prices_shm.close()
+        prices_shm.unlink()
+        codes_shm.close()
+        codes_shm.unlink()
+    
+    quote_rows, hedge_rows, account_rows, robust, upside = (
+        np.concatenate([r[i] for r in results]) for i in range(5))
+    rows = [row for r in results for row in r[5]]
+    order = np.lexsort((account_rows, quote_rows, -robust))[:top_k]
+    names = availability['accounts'] if availability is not None else []
+    
+    opportunities = []
+    for n in order.tolist():
+        account = int(account_rows[n])
+        stake, numbers = rows[n]
+        candidate = row_candidate(quotes[quote_rows[n]], quotes[hedge_rows[n]], stake,
+                                  names[account] if account >= 0 else None)
+        opportunity = evaluate_candidate(candidate, numbers)
+        attach_scores(opportunity['calculation'], float(robust[n]), float(upside[n]))
+        opportunities.append(opportunity)
+    return opportunities
+
+def print_opportunity(opportunity):
+    """Print one opportunity's bets, outcomes and profit"""
+    result = opportunity['calculation']
+    
+    print(f"\n📌 {opportunity['description']}")
+    
+    print(f"\n  Bonus Bet:")
+    print(f"    ${result['bonus_stake']} on {result['bonus_team']} @ {result['bonus_odds']}")
+    print(f"    (Uses your ${result['bonus_stake']} bonus credit)")
+    
+    print(f"\n  Hedge Bet:")
+    print(f"    ${result['hedge_stake']} real money on {result['hedge_team']} @ {result['hedge_odds']}")
+    print(f"    (You risk: ${result['total_real_money_risk']})")
+    
+    print(f"\n  Outcomes:")
+    print(f"    If {result['bonus_team']} wins: +${result['scenario_bonus_wins']}")
+    print(f"    If {result['hedge_team']} wins: +${result['scenario_hedge_wins']}")
+    
+    print(f"\n  💰 GUARANTEED PROFIT: ${result['guaranteed_profit']}")
+    print(f"  📈 ROI: {result['roi_pct']}%")
+    if 'robust_profit' in result:
+        band = result['sensitivity']
+        print(f"  🛡️  Worst case (±{band['move_cents']}¢, partial fills): ${result['robust_profit']}")
 
-def find_arbs(promos_file):
+def find_arbs(promos_file, notifier=None, wallet=None, workers=None, top_k=None, availability=None,
+              feed=None):
     """
     Load promos and find arbitrage opportunities
+
+    Opportunities are ranked by worst-case profit under small line moves.
+    If a notifier is given, each opportunity is pushed as soon as it is scored.
+    If a wallet (list of active promos) is given, each promo's best hedged
+    conversion is priced against the same quotes. `workers` shards detection
+    across processes; `top_k` keeps only the best K opportunities.
+    `availability` (see availability.py) restricts candidates to what our
+    accounts can legally place, staked at each account's bonus.
+    If a feed (FeedWriter) is given, the opportunities are appended to it.
     """
     
     if not promos_file or not Path(promos_file).exists():
         promos = {}  # Demo mode with no file
     else:
-        with open(promos_file, 'r') as f:
-            promos = json.load(f)
+        promos = load_snapshot(promos_file)
     
-    print(f"📊 Analyzing {len(promos)} sportsbooks for arb opportunities...")
-    print("=" * 70)
+    snapshot = promos.get('data', {})
+    index = LineIndex(normalize_quotes(snapshot))
     
-    opportunities = []
+    print(f"📊 Analyzing {len(index)} lines (moneyline, spreads, totals) for arb opportunities...")
+    print("=" * 70)
     
-    # For now, demonstrate with manual examples
-    # In real deployment, OCR will extract actual odds from screenshots
-    
-    example_arbs = [
-        {
-            'description': 'DraftKings $1000 Bonus → FanDuel Hedge',
-            'bonus': {
-                'book': 'DraftKings',
-                'amount': 1000,
-                'team': 'Los Angeles Lakers',
-                'odds': -120  # American odds
-            },
-            'hedge': {
-                'book': 'FanDuel',
-                'team': 'Boston Celtics',
-                'odds': 110  # American odds
+    if len(index) and workers:
+        candidates = None
+    elif len(index):
+        candidates = build_candidates(index, availability=availability)
+    else:
+        # No priced quotes yet - demonstrate with manual examples
+        candidates = [
+            {
+                'description': 'DraftKings $1000 Bonus → FanDuel Hedge',
+                'bonus': {
+                    'book': 'DraftKings',
+                    'amount': 1000,
+                    'team': 'Los Angeles Lakers',
+                    'odds': -120  # American odds
+                },
+                'hedge': {
+                    'book': 'FanDuel',
+                    'team': 'Boston Celtics',
+                    'odds': 110  # American odds
+                }
             }
-        }
-    ]
+        ]
     
-    for example in example_arbs:
-        print(f"\n📌 {example['description']}")
-        
-        result = calculate_bonus_arb(
-            bonus_amount=example['bonus']['amount'],
-            bonus_book=example['bonus']['book'],
-            bonus_team=example['bonus']['team'],
-            bonus_odds=example['bonus']['odds'],
-            hedge_book=example['hedge']['book'],
-            hedge_team=example['hedge']['team'],
-            hedge_odds=example['hedge']['odds']
-        )
-        
-        if result:
-            opportunities.append({
-                'description': example['description'],
-                'calculation': result
-            })
-            
-            print(f"\n  Bonus Bet:")
-            print(f"    ${result['bonus_stake']} on {result['bonus_team']} @ {result['bonus_odds']}")
-            print(f"    (Uses your ${result['bonus_stake']} bonus credit)")
-            
-            print(f"\n  Hedge Bet:")
-            print(f"    ${result['hedge_stake']} real money on {result['hedge_team']} @ {result['hedge_odds']}")
-            print(f"    (You risk: ${result['total_real_money_risk']})")
-            
-            print(f"\n  Outcomes:")
-            print(f"    If {result['bonus_team']} wins: +${result['scenario_bonus_wins']}")
-            print(f"    If {result['hedge_team']} wins: +${result['scenario_hedge_wins']}")
-            
-            print(f"\n  💰 GUARANTEED PROFIT: ${result['guaranteed_profit']}")
-            print(f"  📈 ROI: {result['roi_pct']}%")
+    if candidates is None:
+        opportunities = detect_sharded(index, workers=workers, top_k=top_k, availability=availability)
+    else:
+        opportunities = evaluate_candidates(candidates)[:top_k]
+    
+    for i, opportunity in enumerate(opportunities):
+        if notifier:
+            notifier.notify([opportunity])
+        if i < PRINT_LIMIT:
+            print_opportunity(opportunity)
+    
+    # Adjacent alt lines whose winning ranges overlap
+    middles = index.middles()
+    if middles:
+        print(f"\n🎯 {len(middles)} middle candidates")
+        for middle in middles[:PRINT_LIMIT]:
+            legs = ' / '.join(f"{quote_label(q)} @ {q['price']} ({q['book']})" for q in middle['legs'])
+            print(f"  • {middle['event']} [{middle['market']}]: {legs}, hold {middle['hold'] * 100:.2f}%")
+    
+    # Combined hold of every cross-book pairing, for choosing where to convert
+    if snapshot.get('sources'):
+        holds = compute_holds(snapshot)
+        save_holds(holds, captured_at=promos.get('captured_at'))
+        print_holds(holds)
+    
+    conversions = best_conversions(wallet, index) if wallet else []
+    if conversions:
+        print_conversions(conversions)
     
     # Save results
     output_file = Path(__file__).parent / f"arb_opportunities_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
     with open(output_file, 'w') as f:
         json.dump(opportunities, f, indent=2)
     
+    if middles:
+        with open(output_file.with_name(output_file.name.replace('arb_opportunities_', 'middles_')), 'w') as f:
+            json.dump(middles, f, indent=2)
+    
+    if conversions:
+        with open(output_file.with_name(output_file.name.replace('arb_opportunities_', 'promo_conversions_')), 'w') as f:
+            json.dump(conversions, f, indent=2)
+    
     print("\n" + "=" * 70)
     print(f"✅ Results saved: {output_file}")
+    
+    if feed:
+        appended = feed.append(opportunities)
+        if appended:
+            print(f"📡 Feed {feed.stream_dir.name}: seq {appended[0]}–{appended[1]}")
+    
     print(f"\n📈 Found {len(opportunities)} arb opportunities")
     
+    if notifier:
+        print(f"📣 Alert latency: {notifier.latency_summary()}")
+    
     return opportunities
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find bonus bet arbitrage opportunities in the latest snapshot")
+    parser.add_argument('--wallet', help="JSON file listing active promos to price (see promos.py)")
+    parser.add_argument('--parallel', type=int, nargs='?', const=os.cpu_count() or 1, metavar='WORKERS',
+                        help="shard events across processes (default: all cores)")
+    parser.add_argument('--top-k', type=int, help="keep only the best K opportunities")
+    parser.add_argument('--accounts', help="availability JSON: legal books per state and our accounts")
+    parser.add_argument('--feed', choices=FORMATS, help="also append opportunities to the feed in this format")
+    parser.add_argument('--profile', action='store_true', help="write CPU/memory profiles to analysis/profiles/")
+    args = parser.parse_args()
+    
     # Demo: Run detector
     print("🎯 Bonus Bet Arbitrage Detector\n")
     
-    # Find latest sportsbook data file
-    from pathlib import Path
-    data_dir = Path(__file__).parent
-    data_files = sorted(data_dir.glob("sportsbook_data_*.json"))
+    wallet = load_wallet(args.wallet) if args.wallet else None
+    availability = load_availability(args.accounts) if args.accounts else None
+    feed = FeedWriter('opportunities', format=args.feed) if args.feed else None
+    
+    from notifier import build_notifier_from_env, save_dedup_state
+    # Each scan is its own process, so repeats across scans need the saved index
+    notifier = build_notifier_from_env(persist=True)
     
-    if data_files:
-        latest_file = data_files[-1]
+    # Find latest sportsbook data (full JSON copy or archive manifest)
+    latest_file = latest_snapshot()
+    
+    if latest_file:
         print(f"Using latest data: {latest_file.name}\n")
-        find_arbs(str(latest_file))
     else:
         # Just show example calculation
         print("Showing example calculation:\n")
-        find_arbs(None)
+    
+    profiler = Profiler('detector') if args.profile else None
+    profiled(profiler, 'detector', find_arbs, str(latest_file) if latest_file else None, notifier=notifier,
+             wallet=wallet, workers=args.parallel, top_k=args.top_k, availability=availability, feed=feed)
+    if notifier:
+        save_dedup_state(notifier.dedup)
+    if profiler:
+        profiler.finish()
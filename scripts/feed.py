@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Append-Only Opportunity Feed
+Every detector/report run appends its records to a stream of segment files
+with monotonically increasing sequence numbers, so consumers read only what
+is new instead of globbing and re-parsing timestamped JSON dumps
+
+Layout (one directory per stream):
+    00000000000000000000.ndjson   segment, named by its first sequence number
+    00000000000000000000.idx      one 32-byte entry per appended batch:
+                                  first seq, record count, start byte, end byte
+    consumers/<name>.json         last sequence a named consumer has read
+
+Formats:
+    ndjson  one {"seq", "at", "record"} object per line — `tail -f` friendly
+    arrow   each segment is one Arrow IPC stream of flattened columns: the
+            schema once, then one record batch per append, readable with
+            pyarrow.ipc.open_stream. Every stream has a fixed schema
+            (STREAM_COLUMNS); fields outside it are kept as JSON in an
+            `extra` column, so segments roll over by size only. (needs pyarrow)
+
+Bytes before a segment's first index entry are its header (the Arrow schema;
+empty for ndjson).
+
+    python3 scripts/feed.py tail opportunities --consumer dashboard --follow
+"""
+
+import argparse
+import fcntl
+import json
+import mmap
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from archive import ANALYSIS_DIR
+
+FEED_DIR = ANALYSIS_DIR / "feed"
+FORMATS = {'ndjson': '.ndjson', 'arrow': '.arrow'}
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+DEFAULT_FOLLOW_SECONDS = 2
+
+# Arrow IPC end-of-stream marker; segments never carry one, so they stay appendable
+ARROW_EOS = b'\xff\xff\xff\xff\x00\x00\x00\x00'
+
+# Arrow column types per stream (flattened names); every column is nullable.
+# Streams not listed here keep all their fields in `extra`.
+OPPORTUNITY_COLUMNS = {
+    'description': 'string',
+    'detected_at': 'float64',
+    'sport': 'string',
+    'event': 'string',
+    'market': 'string',
+    'point': 'float64',
+    'account': 'string',
+    'calculation.bonus_book': 'string',
+    'calculation.bonus_team': 'string',
+    'calculation.bonus_odds': 'float64',
+    'calculation.bonus_stake': 'float64',
+    'calculation.hedge_book': 'string',
+    'calculation.hedge_team': 'string',
+    'calculation.hedge_odds': 'float64',
+    'calculation.hedge_stake': 'float64',
+    'calculation.scenario_bonus_wins': 'float64',
+    'calculation.scenario_hedge_wins': 'float64',
+    'calculation.guaranteed_profit': 'float64',
+    'calculation.roi_pct': 'float64',
+    'calculation.total_real_money_risk': 'float64',
+    'calculation.robust_profit': 'float64',
+    'calculation.sensitivity.move_cents': 'float64',
+    'calculation.sensitivity.step_cents': 'float64',
+    'calculation.sensitivity.fill_fractions': 'list<float64>',
+    'calculation.sensitivity.worst_profit': 'float64',
+    'calculation.sensitivity.best_profit': 'float64',
+}
+REPORT_COLUMNS = {
+    'generated_at': 'string',
+    'summary.total_opportunities': 'int64',
+    'summary.profitable': 'int64',
+    'summary.total_guaranteed_profit': 'float64',
+    'summary.average_roi': 'float64',
+    'source_file': 'string',
+}
+STREAM_COLUMNS = {
+    'opportunities': OPPORTUNITY_COLUMNS,
+    'inplay': OPPORTUNITY_COLUMNS,
+    'reports': REPORT_COLUMNS,
+}
+
+INDEX_DTYPE = np.dtype([('seq', '<u8'), ('count', '<u8'), ('start', '<u8'), ('end', '<u8')])
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ImportError("The arrow feed format needs pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def _flatten(record, prefix=''):
+    """Nested dicts to dotted columns, e.g. calculation.guaranteed_profit"""
+    flat = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def _arrow_schema(columns):
+    """seq, at, the stream's typed columns, then `extra` (JSON of anything else)"""
+    pa = _pyarrow()
+    types = {'string': pa.string(), 'float64': pa.float64(), 'int64': pa.int64(),
+             'list<float64>': pa.list_(pa.float64())}
+    return pa.schema([('seq', pa.int64()), ('at', pa.string())]
+                     + [(name, types[kind]) for name, kind in columns.items()]
+                     + [('extra', pa.string())])
+
+
+def _segments(stream_dir):
+    """[(base seq, segment path, format)] oldest first"""
+    found = []
+    for fmt, suffix in FORMATS.items():
+        for path in stream_dir.glob(f"*{suffix}"):
+            found.append((int(path.stem), path, fmt))
+    return sorted(found)
+
+
+def _header(segment):
+    """Bytes before the segment's first batch"""
+    index = _read_index(segment)
+    if not len(index):
+        return b''
+    with open(segment, 'rb') as f:
+        return f.read(int(index[0]['start']))
+
+
+def _read_index(segment):
+    path = segment.with_suffix('.idx')
+    if not path.exists():
+        return np.zeros(0, dtype=INDEX_DTYPE)
+    entries = np.fromfile(path, dtype=np.uint8)
+    # Ignore a torn trailing entry from an interrupted append
+    usable = len(entries) - len(entries) % INDEX_DTYPE.itemsize
+    return entries[:usable].view(INDEX_DTYPE)
+
+
+class FeedWriter:
+    """
+    Appends batches of records to one stream
+
+    Appends are serialized with a lock file, so several processes (cron
+    scans, the in-play loop) can share a stream and still get one gap-free
+    sequence. `columns` overrides the stream's arrow columns (STREAM_COLUMNS).
+    """
+
+    def __init__(self, stream, format='ndjson', feed_dir=FEED_DIR, segment_bytes=DEFAULT_SEGMENT_BYTES,
+                 columns=None):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown feed format {format!r} (use {', '.join(FORMATS)})")
+        if format == 'arrow':
+            _pyarrow()
+        self.stream_dir = Path(feed_dir) / stream
+        self.format = format
+        self.segment_bytes = segment_bytes
+        self.columns = STREAM_COLUMNS.get(stream, {}) if columns is None else columns
+        self.stream_dir.mkdir(parents=True, exist_ok=True)
+
+    def _tail(self):
+        """(segment path, next seq, committed end byte) after recovering from a torn append"""
+        segments = _segments(self.stream_dir)
+        if not segments:
+            return None, 0, 0
+        base, segment, fmt = segments[-1]
+        if fmt != self.format:
+            raise ValueError(f"Feed {self.stream_dir.name} is {fmt}, not {self.format}")
+        index = _read_index(segment)
+        index_path = segment.with_suffix('.idx')
+        if index_path.exists() and index_path.stat().st_size > index.nbytes:
+            # A torn entry would misalign every entry appended after it
+            with open(index_path, 'r+b') as f:
+                f.truncate(index.nbytes)
+        if not len(index):
+            next_seq, end = base, 0
+        else:
+            last = index[-1]
+            next_seq, end = int(last['seq'] + last['count']), int(last['end'])
+        # Bytes past the last index entry were never committed
+        if segment.stat().st_size > end:
+            with open(segment, 'r+b') as f:
+                f.truncate(end)
+        return segment, next_seq, end
+
+    def _encode(self, records, first_seq, at):
+        """(segment header, batch payload) for one append"""
+        if self.format == 'ndjson':
+            lines = (json.dumps({'seq': first_seq + i, 'at': at, 'record': r}, separators=(',', ':'))
+                     for i, r in enumerate(records))
+            return b'', ('\n'.join(lines) + '\n').encode()
+
+        pa = _pyarrow()
+        rows = [_flatten(r) for r in records]
+        columns = {'seq': list(range(first_seq, first_seq + len(rows))), 'at': [at] * len(rows)}
+        for name in self.columns:
+            columns[name] = [row.get(name) for row in rows]
+        extras = [{k: v for k, v in row.items() if k not in self.columns} for row in rows]
+        columns['extra'] = [json.dumps(e, default=str) if e else None for e in extras]
+        # Cast to the stream's fixed schema, so every batch shares one segment header
+        table = pa.Table.from_pydict(columns, schema=_arrow_schema(self.columns))
+        # The schema message is what an empty stream holds before its end marker
+        sink = pa.BufferOutputStream()
+        pa.ipc.new_stream(sink, table.schema).close()
+        header = sink.getvalue().to_pybytes()[:-len(ARROW_EOS)]
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return header, sink.getvalue().to_pybytes()[len(header):-len(ARROW_EOS)]
+
+    def append(self, records):
+        """Append one batch; returns (first seq, last seq), or None if empty"""
+        records = list(records)
+        if not records:
+            return None
+
+        with open(self.stream_dir / ".lock", 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            segment, next_seq, end = self._tail()
+            header, payload = self._encode(records, next_seq, datetime.now().isoformat())
+            # A header mismatch only happens when STREAM_COLUMNS changed between versions
+            if segment is None or end >= self.segment_bytes or (end and header != _header(segment)):
+                segment = self.stream_dir / f"{next_seq:020d}{FORMATS[self.format]}"
+                end = 0
+
+            with open(segment, 'ab') as f:
+                if not end:
+                    f.write(header)
+                    end = len(header)
+                f.write(payload)
+            # The index entry is the commit point: readers never go past it
+            entry = np.array([(next_seq, len(records), end, end + len(payload))], dtype=INDEX_DTYPE)
+            with open(segment.with_suffix('.idx'), 'ab') as f:
+                f.write(entry.tobytes())
+
+        return next_seq, next_seq + len(records) - 1
+
+
+class FeedReader:
+    """
+    Reads a stream from any sequence number onward
+
+    With a `consumer` name, the last sequence read is kept on disk so the
+    next read resumes after it.
+    """
+
+    def __init__(self, stream, consumer=None, feed_dir=FEED_DIR):
+        self.stream_dir = Path(feed_dir) / stream
+        self.consumer = consumer
+
+    def _cursor_path(self):
+        return self.stream_dir / "consumers" / f"{self.consumer}.json"
+
+    @property
+    def position(self):
+        """Last sequence this consumer committed, or -1"""
+        if self.consumer is None or not self._cursor_path().exists():
+            return -1
+        with open(self._cursor_path()) as f:
+            return json.load(f)['seq']
+
+    def commit(self, seq):
+        path = self._cursor_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'seq': seq, 'at': datetime.now().isoformat()}, f)
+        tmp.replace(path)
+
+    def read(self, after=None):
+        """
+        Yield (seq, record) for every committed record with seq > `after`
+        (default: this consumer's position)
+
+        Segments and batches that end before `after` are skipped through the
+        index without being read.
+        """
+        after = self.position if after is None else after
+        segments = _segments(self.stream_dir) if self.stream_dir.exists() else []
+        for i, (base, segment, fmt) in enumerate(segments):
+            if i + 1 < len(segments) and segments[i + 1][0] <= after + 1:
+                continue
+            index = _read_index(segment)
+            header_end = int(index[0]['start']) if len(index) else 0
+            index = index[index['seq'] + index['count'] > after + 1]
+            if not len(index):
+                continue
+            with open(segment, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                header = mapped[:header_end]
+                for entry in index:
+                    for seq, record in self._decode(fmt, header, mapped[int(entry['start']):int(entry['end'])]):
+                        if seq > after:
+                            yield seq, record
+
+    @staticmethod
+    def _decode(fmt, header, payload):
+        if fmt == 'ndjson':
+            for line in payload.splitlines():
+                item = json.loads(line)
+                yield item['seq'], item['record']
+            return
+        pa = _pyarrow()
+        for row in pa.ipc.open_stream(pa.py_buffer(header + payload)).read_all().to_pylist():
+            extra = row.pop('extra', None)
+            if extra:
+                row.update(json.loads(extra))
+            yield row.pop('seq'), row
+
+    def poll(self):
+        """Everything new since this consumer's last poll, committing the new position"""
+        records = list(self.read())
+        if records and self.consumer is not None:
+            self.commit(records[-1][0])
+        return records
+
+    def read_table(self, after=-1):
+        """Arrow table of every record after `after` (arrow streams only)"""
+        pa = _pyarrow()
+        return pa.Table.from_pylist([dict(record, seq=seq) for seq, record in self.read(after=after)])
+
+
+def tail(stream, consumer=None, follow=False, interval=DEFAULT_FOLLOW_SECONDS, feed_dir=FEED_DIR):
+    """Print new records as NDJSON; with `follow`, keep polling"""
+    reader = FeedReader(stream, consumer=consumer, feed_dir=feed_dir)
+    position = reader.position
+    while True:
+        for seq, record in reader.read(after=position):
+            print(json.dumps({'seq': seq, 'record': record}, default=str), flush=True)
+            position = seq
+        if consumer is not None and position > reader.position:
+            reader.commit(position)
+        if not follow:
+            return
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read the append-only opportunity feed")
+    sub = parser.add_subparsers(dest='command', required=True)
+    tail_parser = sub.add_parser('tail', help="print records newer than the consumer's position")
+    tail_parser.add_argument('stream', help="stream name, e.g. opportunities or reports")
+    tail_parser.add_argument('--consumer', help="remember the position under this name")
+    tail_parser.add_argument('--follow', action='store_true', help="keep polling for new records")
+    tail_parser.add_argument('--interval', type=float, default=DEFAULT_FOLLOW_SECONDS)
+    args = parser.parse_args()
+
+    try:
+        tail(args.stream, consumer=args.consumer, follow=args.follow, interval=args.interval)
+    except KeyboardInterrupt:
+        pass
@@ -4,11 +4,14 @@ Format JSON arb data into human-readable markdown
 Generates: bets-now.md, bets-this-week.md, index.md
 """
 
+import argparse
 import json
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
+from profiling import Profiler, profiled
+
 def load_latest_arb_data():
     """Load latest arb opportunities JSON"""
     reports_dir = Path(__file__).parent.parent / "reports"
@@ -379,4 +382,11 @@ def main():
     print(f"   👉 Open: {reports_dir}/bets-now.md")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Format the latest arb data into markdown reports")
+    parser.add_argument('--profile', action='store_true', help="write CPU/memory profiles to analysis/profiles/")
+    args = parser.parse_args()
+    
+    profiler = Profiler('format-report') if args.profile else None
+    profiled(profiler, 'format-report', main)
+    if profiler:
+        profiler.finish()
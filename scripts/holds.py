@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Market Hold Matrix
+Computes the combined hold (overround) of every cross-book pairing for every
+event in one vectorized pass, and keeps a history for trend queries
+"""
+
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from quotes import normalize_quotes
+from sensitivity import american_to_decimal_array
+
+HOLDS_DB = Path(__file__).parent.parent / "analysis" / "market_holds.db"
+
+# Lowest-hold pairings kept per event
+TOP_PAIRS_PER_EVENT = 5
+
+
+def build_price_arrays(snapshot):
+    """
+    Lay out two-way moneyline prices as (events × books) arrays
+
+    Side A/B are the event's two outcomes in name order, so every book's
+    prices line up. Missing quotes are NaN.
+
+    Returns (events, books, side_a, side_b) where events is a list of
+    (sport, event, side_a_name, side_b_name).
+    """
+    quotes = {}
+    books = set()
+
+    for quote in normalize_quotes(snapshot):
+        if quote['market'] != 'h2h':
+            continue
+        key = (quote['sport'], quote['event']) + quote['sides']
+        prices = quotes.setdefault(key, {}).setdefault(quote['book'], [None, None])
+        prices[quote['side']] = quote['price']
+        books.add(quote['book'])
+
+    events = sorted(quotes)
+    books = sorted(books)
+    book_index = {b: i for i, b in enumerate(books)}
+
+    side_a = np.full((len(events), len(books)), np.nan)
+    side_b = np.full((len(events), len(books)), np.nan)
+    for e, key in enumerate(events):
+        for book, (price_a, price_b) in quotes[key].items():
+            if price_a is not None and price_b is not None:
+                side_a[e, book_index[book]] = price_a
+                side_b[e, book_index[book]] = price_b
+
+    return events, books, side_a, side_b
+
+
+def hold_matrix(side_a, side_b):
+    """
+    Combined hold for every (book taking side A, book taking side B)
+
+    hold[e, i, j] = 1/decimal(A at book i) + 1/decimal(B at book j) - 1.
+    Negative hold is a pure two-way arb.
+    """
+    implied_a = 1 / american_to_decimal_array(side_a)
+    implied_b = 1 / american_to_decimal_array(side_b)
+    return implied_a[:, :, None] + implied_b[:, None, :] - 1
+
+
+def lowest_hold_pairings(events, books, holds, top_n=TOP_PAIRS_PER_EVENT):
+    """
+    Rank cross-book pairings by hold, per event and per book
+
+    Returns (per_event, per_book):
+    per_event  {event_key: [{'book_a', 'book_b', 'hold'}, ...]} lowest first
+    per_book   {book: {'event', 'partner', 'book_side', 'hold'}} best pairing
+               involving that book on either side
+    """
+    n_events, n_books = holds.shape[0], len(books)
+    if n_events == 0 or n_books == 0:
+        return {}, {}
+
+    # Same-book pairs are the book's own vig, not a cross-book pairing
+    cross = np.where(np.isnan(holds), np.inf, holds)
+    cross[:, np.arange(n_books), np.arange(n_books)] = np.inf
+
+    flat = cross.reshape(n_events, -1)
+    k = min(top_n, flat.shape[1])
+    top = np.argpartition(flat, k - 1, axis=1)[:, :k]
+    top_holds = np.take_along_axis(flat, top, axis=1)
+    order = np.argsort(top_holds, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    top_holds = np.take_along_axis(top_holds, order, axis=1)
+
+    per_event = {}
+    for e, event in enumerate(events):
+        per_event[event] = [
+            {'book_a': books[idx // n_books], 'book_b': books[idx % n_books], 'hold': round(float(h), 5)}
+            for idx, h in zip(top[e], top_holds[e]) if np.isfinite(h)
+        ]
+
+    # Book k's best pairing is the min over row k (k takes A) and column k (k takes B)
+    as_a = cross.transpose(1, 0, 2).reshape(n_books, -1)
+    as_b = cross.transpose(2, 0, 1).reshape(n_books, -1)
+    best_a = as_a.argmin(axis=1)
+    best_b = as_b.argmin(axis=1)
+
+    per_book = {}
+    for k, book in enumerate(books):
+        hold_a, hold_b = as_a[k, best_a[k]], as_b[k, best_b[k]]
+        if not np.isfinite(min(hold_a, hold_b)):
+            continue
+        side, idx, hold = ('A', best_a[k], hold_a) if hold_a <= hold_b else ('B', best_b[k], hold_b)
+        per_book[book] = {
+            'event': events[idx // n_books][1],
+            'partner': books[idx % n_books],
+            'book_side': side,
+            'hold': round(float(hold), 5)
+        }
+
+    return per_event, per_book
+
+
+def compute_holds(snapshot):
+    """
+    Full hold analysis for one scraper snapshot
+    """
+    events, books, side_a, side_b = build_price_arrays(snapshot)
+    holds = hold_matrix(side_a, side_b)
+    per_event, per_book = lowest_hold_pairings(events, books, holds)
+    return {
+        'events': events,
+        'books': books,
+        'matrix': holds,
+        'per_event': per_event,
+        'per_book': per_book
+    }
+
+
+def _connect(db_path):
+    db_path.parent.mkdir(exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS event_pair_holds (
+            captured_at TEXT, sport TEXT, event TEXT, book_a TEXT, book_b TEXT, hold REAL
+        )""")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS book_holds (
+            captured_at TEXT, book TEXT, event TEXT, partner TEXT, book_side TEXT, hold REAL
+        )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_pair ON event_pair_holds (book_a, book_b, captured_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_book ON book_holds (book, captured_at)")
+    return conn
+
+
+def save_holds(result, captured_at=None, db_path=HOLDS_DB):
+    """Append this scan's lowest-hold pairings to the history database"""
+    captured_at = captured_at or datetime.now().isoformat()
+    with _connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO event_pair_holds VALUES (?, ?, ?, ?, ?, ?)",
+            [(captured_at, event[0], event[1], p['book_a'], p['book_b'], p['hold'])
+             for event, pairs in result['per_event'].items() for p in pairs]
+        )
+        conn.executemany(
+            "INSERT INTO book_holds VALUES (?, ?, ?, ?, ?, ?)",
+            [(captured_at, book, b['event'], b['partner'], b['book_side'], b['hold'])
+             for book, b in result['per_book'].items()]
+        )
+    conn.close()
+
+
+def hold_trend(book_a, book_b=None, since=None, db_path=HOLDS_DB):
+    """
+    Best recorded hold per scan for a book (or a specific book pairing)
+
+    Returns [(captured_at, hold), ...] oldest first.
+    """
+    with _connect(db_path) as conn:
+        if book_b is None:
+            rows = conn.execute(
+                "SELECT captured_at, MIN(hold) FROM book_holds WHERE book = ? AND captured_at >= ? "
+                "GROUP BY captured_at ORDER BY captured_at",
+                (book_a, since or '')
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT captured_at, MIN(hold) FROM event_pair_holds "
+                "WHERE ((book_a = ? AND book_b = ?) OR (book_a = ? AND book_b = ?)) AND captured_at >= ? "
+                "GROUP BY captured_at ORDER BY captured_at",
+                (book_a, book_b, book_b, book_a, since or '')
+            ).fetchall()
+    conn.close()
+    return rows
+
+
+def print_holds(result, limit=5):
+    """Print the lowest-hold pairing for each book"""
+    print(f"\n📉 Lowest-hold pairings ({len(result['events'])} events × {len(result['books'])} books)")
+    ranked = sorted(result['per_book'].items(), key=lambda item: item[1]['hold'])
+    for book, best in ranked[:limit]:
+        print(f"  • {book} + {best['partner']}: {best['hold'] * 100:.2f}% hold ({best['event']})")
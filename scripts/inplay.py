@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+In-Play Fast Refresh
+Tracks only games in progress (ESPN status, Bovada's live feed) and polls
+their markets on a tight interval. Each tick fetches just the live events,
+diffs quotes against the previous tick and re-runs detection on the events
+whose prices moved.
+
+    python3 scripts/inplay.py --sports nba nfl --interval 3
+"""
+
+import argparse
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from adapters import ADAPTERS, run_adapters
+from availability import load_availability
+from detector import build_candidates, evaluate_candidates
+from feed import FORMATS, FeedWriter
+from notifier import build_notifier_from_env
+from quotes import LineIndex, normalize_quotes
+import scraper  # noqa: F401  registers the odds sources
+
+DEFAULT_TICK_SECONDS = 3
+DEFAULT_DISCOVERY_SECONDS = 60
+# Ticks kept for the latency summary
+TICK_HISTORY = 1000
+PRINT_LIMIT = 3
+
+QUOTE_SOURCE = 'aggregated_odds_api'
+STATUS_SOURCES = ('espn', 'bovada')
+# The scheduled scraper caps events per sport; live tracking needs every game
+UNCAPPED = {QUOTE_SOURCE: {'limit': None}, 'espn': {'limit': None}, 'bovada': {'limit': None, 'group_limit': None}}
+
+
+def espn_live_events(records):
+    """Events ESPN reports as in progress"""
+    return {r['event'] for r in records
+            if r.get('event') and (r.get('status') or {}).get('state') == 'in'}
+
+
+def bovada_live_events(records):
+    """Events on Bovada's live feed, renamed from 'Away @ Home' to 'Home vs Away'"""
+    live = set()
+    for r in records:
+        away, sep, home = (r.get('game') or '').partition(' @ ')
+        if sep:
+            live.add(f"{home} vs {away}")
+    return live
+
+
+def quote_key(quote):
+    return LineIndex.key_for(quote) + (quote['side'], quote['book'])
+
+
+def quotes_by_event(quotes):
+    """{event: {quote key: quote}}"""
+    events = {}
+    for quote in quotes:
+        events.setdefault(quote['event'], {})[quote_key(quote)] = quote
+    return events
+
+
+def changed_events(previous, current):
+    """Events whose set of quotes or any price differs between two ticks"""
+    changed = set()
+    for event in previous.keys() | current.keys():
+        before, after = previous.get(event, {}), current.get(event, {})
+        if before.keys() != after.keys() or any(before[k]['price'] != after[k]['price'] for k in after):
+            changed.add(event)
+    return changed
+
+
+class InPlayLoop:
+    """
+    Discovery every `discovery_seconds` (which games are live, and their
+    Odds API ids), then one batched request per sport every `tick_seconds`
+    for just those games
+    """
+
+    def __init__(self, sports, tick_seconds=DEFAULT_TICK_SECONDS, discovery_seconds=DEFAULT_DISCOVERY_SECONDS,
+                 notifier=None, availability=None, feed=None):
+        self.sports = sports
+        self.tick_seconds = tick_seconds
+        self.discovery_seconds = discovery_seconds
+        self.notifier = notifier
+        self.availability = availability
+        self.feed = feed
+        self.source = ADAPTERS[QUOTE_SOURCE]
+        self.live = {sport: {} for sport in sports}     # sport -> {event: odds api event id}
+        self.quotes = {}                                # event -> {quote key: quote}
+        self.dirty = set()                              # events to detect on next tick regardless of diff
+        self.ticks = deque(maxlen=TICK_HISTORY)
+        self.discovered_at = None
+        self._pool = ThreadPoolExecutor(max_workers=len(sports), thread_name_prefix='inplay')
+
+    def discover(self):
+        """Refresh the set of live games from ESPN/Bovada status and a full odds pull"""
+        adapters = [ADAPTERS[name] for name in (QUOTE_SOURCE,) + STATUS_SOURCES if name in ADAPTERS]
+        results, _ = run_adapters(self.sports, adapters=adapters, persist=False, parse_options=UNCAPPED)
+
+        quotes = []
+        for sport, sources in results.items():
+            live = espn_live_events(sources.get('espn', [])) | bovada_live_events(sources.get('bovada', []))
+            records = sources.get(QUOTE_SOURCE, [])
+            self.live[sport] = {r['event']: r['event_id'] for r in records
+                                if r.get('event') in live and r.get('event_id')}
+            quotes.extend(normalize_quotes({'sources': {sport: {QUOTE_SOURCE: [
+                r for r in records if r.get('event') in self.live[sport]]}}}))
+
+        self.quotes = quotes_by_event(quotes)
+        # Re-seeded prices are never diffed against the old ones, so every
+        # live game gets one full detection on the next tick
+        self.dirty |= self.quotes.keys()
+        self.discovered_at = time.monotonic()
+        return sum(len(events) for events in self.live.values())
+
+    def _fetch(self, sport):
+        """Latest records for one sport's live games only; None if the source is down"""
+        event_ids = sorted(set(self.live[sport].values()))
+        if not event_ids or not self.source.breaker.allow():
+            return None
+        try:
+            records = self.source.fetch(sport, params={'eventIds': ','.join(event_ids)}, **UNCAPPED[QUOTE_SOURCE])
+        except Exception as e:
+            self.source.breaker.record_failure()
+            print(f"⚠️  {sport.upper()} live fetch failed: {e}")
+            return None
+        self.source.breaker.record_success()
+        return records
+
+    def tick(self):
+        """
+        Fetch, diff, detect on changed (and newly discovered) games and push;
+        returns the tick's stats
+        """
+        started = time.perf_counter()
+        fetched = dict(zip(self.sports, self._pool.map(self._fetch, self.sports)))
+        fetch_ms = (time.perf_counter() - started) * 1000
+
+        current = dict(self.quotes)
+        for sport, records in fetched.items():
+            if records is None:
+                continue  # keep last known prices for a sport we could not refresh
+            for event in self.live[sport]:
+                current.pop(event, None)
+            current.update(quotes_by_event(normalize_quotes({'sources': {sport: {QUOTE_SOURCE: records}}})))
+        changed = changed_events(self.quotes, current) | self.dirty
+        self.quotes = current
+        self.dirty = set()
+
+        detect_started = time.perf_counter()
+        # Hedges never cross events, so the changed games can be detected alone
+        index = LineIndex(q for event in changed for q in current.get(event, {}).values())
+        opportunities = evaluate_candidates(build_candidates(index, availability=self.availability))
+        detect_ms = (time.perf_counter() - detect_started) * 1000
+
+        if self.notifier and opportunities:
+            self.notifier.notify(opportunities)
+        if self.feed and opportunities:
+            self.feed.append(opportunities)
+        finished = time.perf_counter()
+
+        stats = {
+            'live_events': sum(len(events) for events in self.live.values()),
+            'changed_events': len(changed),
+            'opportunities': len(opportunities),
+            'fetch_ms': round(fetch_ms, 2),
+            'detect_ms': round(detect_ms, 2),
+            'detect_to_output_ms': round((finished - detect_started) * 1000, 2),
+            'tick_ms': round((finished - started) * 1000, 2),
+            'top': opportunities[:PRINT_LIMIT]
+        }
+        self.ticks.append(stats)
+        return stats
+
+    def run(self, max_ticks=None):
+        """
+        Tick on a fixed schedule until interrupted (or `max_ticks`)
+
+        A tick that runs long is not followed by catch-up ticks; the next one
+        starts on the next free slot and the skipped slots are counted.
+        """
+        ticks = 0
+        next_at = time.monotonic()
+        while max_ticks is None or ticks < max_ticks:
+            if self.discovered_at is None or time.monotonic() - self.discovered_at >= self.discovery_seconds:
+                live = self.discover()
+                print(f"\n🔴 {live} live games: " + ', '.join(e for events in self.live.values() for e in events))
+
+            stats = self.tick()
+            ticks += 1
+            print_tick(ticks, stats)
+
+            next_at += self.tick_seconds
+            now = time.monotonic()
+            if now > next_at:
+                stats['skipped_slots'] = int((now - next_at) // self.tick_seconds) + 1
+                next_at += stats['skipped_slots'] * self.tick_seconds
+            time.sleep(max(0.0, next_at - time.monotonic()))
+
+    def latency_summary(self):
+        """p50/p95/max of tick time and detection-to-output latency"""
+        summary = {'ticks': len(self.ticks),
+                   'skipped_slots': sum(t.get('skipped_slots', 0) for t in self.ticks)}
+        for field in ('tick_ms', 'detect_to_output_ms'):
+            values = sorted(t[field] for t in self.ticks)
+            if values:
+                summary[field] = {
+                    'p50': values[len(values) // 2],
+                    'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+                    'max': values[-1]
+                }
+        return summary
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def print_tick(number, stats):
+    """One status line per tick, plus the best opportunities when games moved"""
+    print(f"⚡ tick {number}: {stats['live_events']} live, {stats['changed_events']} changed, "
+          f"{stats['opportunities']} opps — fetch {stats['fetch_ms']:.0f}ms, "
+          f"detect→output {stats['detect_to_output_ms']:.1f}ms, tick {stats['tick_ms']:.0f}ms")
+    for opp in stats['top']:
+        calc = opp['calculation']
+        print(f"   • {opp['event']}: {calc['bonus_team']} @ {calc['bonus_odds']} ({calc['bonus_book']}) / "
+              f"{calc['hedge_team']} @ {calc['hedge_odds']} ({calc['hedge_book']}) → "
+              f"${calc['guaranteed_profit']} (worst ${calc.get('robust_profit')})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Poll live games on a tight interval and detect on every move")
+    parser.add_argument('--sports', nargs='+', default=['nba'])
+    parser.add_argument('--interval', type=float, default=DEFAULT_TICK_SECONDS, help="seconds between ticks")
+    parser.add_argument('--discovery', type=float, default=DEFAULT_DISCOVERY_SECONDS,
+                        help="seconds between checks for games starting or ending")
+    parser.add_argument('--ticks', type=int, help="stop after this many ticks")
+    parser.add_argument('--accounts', help="availability JSON (see availability.py)")
+    parser.add_argument('--feed', choices=FORMATS, help="append opportunities to the 'inplay' feed stream")
+    args = parser.parse_args()
+
+    loop = InPlayLoop(
+        args.sports,
+        tick_seconds=args.interval,
+        discovery_seconds=args.discovery,
+        notifier=build_notifier_from_env(),
+        availability=load_availability(args.accounts) if args.accounts else None,
+        feed=FeedWriter('inplay', format=args.feed) if args.feed else None
+    )
+    try:
+        loop.run(max_ticks=args.ticks)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.close()
+        print(f"\n📊 In-play latency: {loop.latency_summary()}")
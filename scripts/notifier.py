@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Opportunity Push Notifier
+Delivers new or improved arb opportunities to webhook, SMTP and socket sinks
+as soon as the detector emits them, instead of waiting for a markdown commit
+"""
+
+import heapq
+import itertools
+import json
+import os
+import smtplib
+import socket
+import time
+from datetime import datetime
+from email.message import EmailMessage
+from pathlib import Path
+
+import requests
+
+DEDUP_FILE = Path(__file__).parent.parent / "analysis" / "notify_dedup.json"
+
+# Odds within the same bucket count as the same price for dedup purposes
+DEFAULT_PRICE_BUCKET = 5
+DEFAULT_TTL_SECONDS = 30 * 60
+# Minimum profit gain (in $) before a re-priced opportunity is re-sent
+DEFAULT_MIN_IMPROVEMENT = 5.0
+
+
+def opportunity_key(opportunity, price_bucket=DEFAULT_PRICE_BUCKET):
+    """
+    Build the dedup key for an opportunity: (event, account, legs, price bucket)
+
+    `account` is None unless the detector ran with an availability model, so
+    each account is alerted separately for the same legs.
+    """
+    calc = opportunity['calculation']
+    event = opportunity.get('event') or opportunity.get('description')
+    legs = (
+        (calc['bonus_book'], calc['bonus_team']),
+        (calc['hedge_book'], calc['hedge_team']),
+    )
+    bucket = (
+        int(calc['bonus_odds'] // price_bucket),
+        int(calc['hedge_odds'] // price_bucket),
+    )
+    return (event, opportunity.get('account'), legs, bucket)
+
+
+def _as_tuple(value):
+    """JSON lists back to the nested tuples keys are built from"""
+    return tuple(_as_tuple(v) for v in value) if isinstance(value, list) else value
+
+
+class DedupIndex:
+    """
+    In-memory dedup index with TTL expiry
+
+    Keys are (event, account, legs, price bucket). A key seen within its TTL is
+    suppressed; a key whose legs were already alerted at a better profit is
+    suppressed unless it beats that profit by `min_improvement`.
+
+    One-shot runs (detector.py) carry the index across runs with
+    load_dedup_state()/save_dedup_state().
+    """
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, min_improvement=DEFAULT_MIN_IMPROVEMENT,
+                 clock=time.time):
+        self.ttl_seconds = ttl_seconds
+        self.min_improvement = min_improvement
+        self.clock = clock
+        self._expiry = {}       # key -> expires_at
+        self._best = {}         # (event, account, legs) -> (profit, expires_at)
+        self._heap = []         # (expires_at, tiebreak, key) for lazy purging
+        self._tiebreak = itertools.count()
+
+    def __len__(self):
+        self.purge()
+        return len(self._expiry)
+
+    def purge(self):
+        """Drop every entry whose TTL has elapsed"""
+        now = self.clock()
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(self._heap)
+            if self._expiry.get(key) == expires_at:
+                del self._expiry[key]
+        for legs_key in [k for k, (_, exp) in self._best.items() if exp <= now]:
+            del self._best[legs_key]
+
+    def should_send(self, key, profit):
+        """
+        Return True (and record the key) if this alert is new or materially
+        improved, False if it is a repeat within the TTL
+        """
+        self.purge()
+        if key in self._expiry:
+            return False
+
+        legs_key = key[:3]
+        previous = self._best.get(legs_key)
+        if previous is not None and profit < previous[0] + self.min_improvement:
+            return False
+
+        expires_at = self.clock() + self.ttl_seconds
+        self._expiry[key] = expires_at
+        self._best[legs_key] = (profit, expires_at)
+        heapq.heappush(self._heap, (expires_at, next(self._tiebreak), key))
+        return True
+
+    def to_dict(self):
+        """Unexpired entries; expiry times are wall-clock, so they survive a restart"""
+        self.purge()
+        return {
+            'expiry': [[key, expires_at] for key, expires_at in self._expiry.items()],
+            'best': [[legs_key, profit, expires_at] for legs_key, (profit, expires_at) in self._best.items()]
+        }
+
+    def load(self, state):
+        for key, expires_at in state.get('expiry', []):
+            key = _as_tuple(key)
+            self._expiry[key] = expires_at
+            heapq.heappush(self._heap, (expires_at, next(self._tiebreak), key))
+        for legs_key, profit, expires_at in state.get('best', []):
+            self._best[_as_tuple(legs_key)] = (profit, expires_at)
+        self.purge()
+
+
+def load_dedup_state(dedup, path=DEDUP_FILE):
+    """Restore alerts sent by previous runs that are still within their TTL"""
+    if not path.exists():
+        return
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return
+    dedup.load(saved)
+
+
+def save_dedup_state(dedup, path=DEDUP_FILE):
+    """Persist the dedup index for the next run"""
+    path.parent.mkdir(exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'updated_at': datetime.now().isoformat(), **dedup.to_dict()}, f)
+
+
+class WebhookTransport:
+    """POST each alert as JSON to an HTTP endpoint"""
+
+    name = 'webhook'
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, payload):
+        response = requests.post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+
+class SmtpTransport:
+    """Email each alert through an SMTP relay"""
+
+    name = 'smtp'
+
+    def __init__(self, host, port, sender, recipients, username=None, password=None,
+                 use_tls=False, timeout=10):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = recipients
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def send(self, payload):
+        calc = payload['calculation']
+        message = EmailMessage()
+        message['Subject'] = f"Arb: ${calc['guaranteed_profit']:.2f} — {payload['description']}"
+        message['From'] = self.sender
+        message['To'] = ', '.join(self.recipients)
+        message.set_content(json.dumps(payload, indent=2))
+
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(message)
+
+
+class SocketTransport:
+    """
+    Write each alert as one JSON line to a local socket
+
+    `address` is either "host:port" (TCP) or a filesystem path (Unix socket).
+    """
+
+    name = 'socket'
+
+    def __init__(self, address, timeout=2):
+        self.address = address
+        self.timeout = timeout
+
+    def _connect(self):
+        if ':' in self.address and not self.address.startswith('/'):
+            host, port = self.address.rsplit(':', 1)
+            return socket.create_connection((host, int(port)), timeout=self.timeout)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.address)
+        return sock
+
+    def send(self, payload):
+        line = (json.dumps(payload) + '\n').encode()
+        with self._connect() as sock:
+            sock.sendall(line)
+
+
+class Notifier:
+    """
+    Fan opportunities out to every transport, suppressing repeats and
+    recording detection-to-delivery latency per alert
+    """
+
+    def __init__(self, transports, dedup=None, price_bucket=DEFAULT_PRICE_BUCKET):
+        self.transports = transports
+        self.dedup = dedup or DedupIndex()
+        self.price_bucket = price_bucket
+        self.deliveries = []
+
+    def notify(self, opportunities):
+        """
+        Deliver every new or improved opportunity; returns delivery records
+
+        Only opportunities with a positive guaranteed profit are pushed (the
+        same test report.py applies); every send blocks, so losing
+        candidates must never reach the transports.
+        """
+        records = []
+
+        for opp in opportunities:
+            if opp['calculation']['guaranteed_profit'] <= 0:
+                continue
+            key = opportunity_key(opp, self.price_bucket)
+            if not self.dedup.should_send(key, opp['calculation']['guaranteed_profit']):
+                continue
+
+            detected_at = opp.get('detected_at', time.time())
+            for transport in self.transports:
+                ok = True
+                error = None
+                try:
+                    transport.send(opp)
+                except Exception as e:
+                    ok = False
+                    error = str(e)
+                    print(f"⚠️  {transport.name} delivery failed: {e}")
+
+                records.append({
+                    'description': opp['description'],
+                    'transport': transport.name,
+                    'ok': ok,
+                    'error': error,
+                    'latency_ms': round((time.time() - detected_at) * 1000, 2),
+                })
+
+        self.deliveries.extend(records)
+        return records
+
+    def latency_summary(self):
+        """Summarize delivery latency across everything sent so far"""
+        latencies = sorted(r['latency_ms'] for r in self.deliveries if r['ok'])
+        if not latencies:
+            return {'delivered': 0, 'failed': len(self.deliveries)}
+        return {
+            'delivered': len(latencies),
+            'failed': len(self.deliveries) - len(latencies),
+            'p50_ms': latencies[len(latencies) // 2],
+            'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            'max_ms': latencies[-1],
+        }
+
+
+def build_notifier_from_env(environ=None, persist=False):
+    """
+    Build a Notifier from ARB_NOTIFY_* environment variables
+
+    With `persist`, the dedup index starts from the previous run's saved
+    state (save it again with save_dedup_state when the run ends).
+
+    ARB_NOTIFY_WEBHOOK      URL to POST alerts to
+    ARB_NOTIFY_SOCKET       "host:port" or Unix socket path
+    ARB_NOTIFY_SMTP_HOST    SMTP relay (plus _PORT, _FROM, _TO, _USER, _PASSWORD, _TLS)
+    ARB_NOTIFY_TTL          Dedup TTL in seconds
+
+    Returns None when no transport is configured.
+    """
+    env = os.environ if environ is None else environ
+    transports = []
+
+    if env.get('ARB_NOTIFY_WEBHOOK'):
+        transports.append(WebhookTransport(env['ARB_NOTIFY_WEBHOOK']))
+
+    if env.get('ARB_NOTIFY_SOCKET'):
+        transports.append(SocketTransport(env['ARB_NOTIFY_SOCKET']))
+
+    if env.get('ARB_NOTIFY_SMTP_HOST'):
+        transports.append(SmtpTransport(
+            host=env['ARB_NOTIFY_SMTP_HOST'],
+            port=int(env.get('ARB_NOTIFY_SMTP_PORT', 25)),
+            sender=env.get('ARB_NOTIFY_SMTP_FROM', 'arb-detector@localhost'),
+            recipients=[r.strip() for r in env.get('ARB_NOTIFY_SMTP_TO', '').split(',') if r.strip()],
+            username=env.get('ARB_NOTIFY_SMTP_USER'),
+            password=env.get('ARB_NOTIFY_SMTP_PASSWORD'),
+            use_tls=env.get('ARB_NOTIFY_SMTP_TLS', '').lower() in ('1', 'true', 'yes'),
+        ))
+
+    if not transports:
+        return None
+
+    ttl = float(env.get('ARB_NOTIFY_TTL', DEFAULT_TTL_SECONDS))
+    dedup = DedupIndex(ttl_seconds=ttl)
+    if persist:
+        load_dedup_state(dedup)
+    return Notifier(transports, dedup=dedup)
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Odds Conversions
+American odds helpers shared by the detector and the quote index
+"""
+
+def american_to_decimal(american_odds):
+    """Convert American odds to decimal"""
+    if american_odds > 0:
+        return (american_odds / 100) + 1
+    else:
+        return (100 / abs(american_odds)) + 1
+
+def american_to_implied_prob(american_odds):
+    """Convert American odds to implied probability"""
+    if american_odds > 0:
+        return 100 / (american_odds + 100)
+    else:
+        return abs(american_odds) / (abs(american_odds) + 100)
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Full Pipeline Run
+Scraper → detector → report → format-report in one process, the same steps
+cron and the daily-scan workflow run one script at a time. With --profile,
+each step is a separate stage in one profile run.
+"""
+
+import argparse
+import runpy
+from pathlib import Path
+
+from archive import latest_snapshot
+from detector import find_arbs
+from notifier import build_notifier_from_env, save_dedup_state
+from profiling import Profiler, profiled
+from report import generate_report
+from scraper import run_scraper
+
+
+def run_detector():
+    latest_file = latest_snapshot()
+    # Same cross-scan dedup as detector.py
+    notifier = build_notifier_from_env(persist=True)
+    opportunities = find_arbs(str(latest_file) if latest_file else None, notifier=notifier)
+    if notifier:
+        save_dedup_state(notifier.dedup)
+    return opportunities
+
+
+def run_format_report():
+    # format-report.py has a dash in its name, so it is loaded by path
+    runpy.run_path(str(Path(__file__).parent / "format-report.py"))['main']()
+
+
+def run_pipeline(sports=('nba',), archive=False, profile=False):
+    profiler = Profiler('pipeline') if profile else None
+    profiled(profiler, 'scraper', run_scraper, sports=list(sports), archive=archive)
+    profiled(profiler, 'detector', run_detector)
+    profiled(profiler, 'report', generate_report)
+    profiled(profiler, 'format-report', run_format_report)
+    if profiler:
+        profiler.finish()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run scraper, detector, report and format-report in order")
+    parser.add_argument('--archive', action='store_true', help="archive the snapshot (see scraper.py --archive)")
+    parser.add_argument('--profile', action='store_true', help="write per-stage CPU/memory profiles to analysis/profiles/")
+    args = parser.parse_args()
+
+    run_pipeline(archive=args.archive, profile=args.profile)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Stage Profiler
+Wraps pipeline stages (scraper, detector, report, format-report) in cProfile,
+tracemalloc and a wall-clock stack sampler, and writes per stage:
+
+    <stage>.hot.txt    hottest functions by cumulative and own time
+    <stage>.alloc.txt  peak traced memory and top allocation sites
+    <stage>.folded     collapsed stacks for flamegraph.pl / speedscope
+    <stage>.prof       raw pstats dump (snakeviz, pstats)
+
+Nothing is traced unless --profile is given: `profiled()` with no profiler
+is a plain call.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from archive import ANALYSIS_DIR
+
+PROFILE_DIR = ANALYSIS_DIR / "profiles"
+HOT_FUNCTIONS = 30
+TOP_ALLOCATIONS = 25
+TRACE_FRAMES = 16
+# The interpreter hands the GIL over every 5ms, so sampling faster gains nothing
+SAMPLE_INTERVAL = 0.005
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples every other thread's Python stack on an interval and counts
+    collapsed stacks (thread;outer;...;inner)
+
+    cProfile only sees the thread that enabled it; the sampler also covers
+    adapter worker threads.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._done.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[';'.join([names.get(ident, str(ident))] + stack[::-1])] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+class Profiler:
+    """
+    Profiles named stages of one run into analysis/profiles/<stamp>_<label>/
+
+    Stages should not nest. Work done in child processes (detector.py
+    --parallel, backtest workers) is not captured.
+    """
+
+    def __init__(self, label, out_dir=PROFILE_DIR):
+        self.run_dir = out_dir / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{label}"
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        tracemalloc.start(TRACE_FRAMES)
+        sampler = StackSampler()
+        profile = cProfile.Profile()
+        started, cpu_started = time.perf_counter(), time.process_time()
+        sampler.start()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            sampler.stop()
+            wall, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            self.stages[name] = {
+                'wall_seconds': round(wall, 4),
+                'cpu_seconds': round(cpu, 4),
+                'peak_traced_bytes': peak,
+                'samples': sum(sampler.stacks.values())
+            }
+            self._write(name, profile, snapshot, sampler)
+
+    def run(self, name, fn, *args, **kwargs):
+        with self.stage(name):
+            return fn(*args, **kwargs)
+
+    def _write(self, name, profile, snapshot, sampler):
+        stats = self.stages[name]
+        profile.dump_stats(str(self.run_dir / f"{name}.prof"))
+
+        out = io.StringIO()
+        out.write(f"{name}: {stats['wall_seconds']:.3f}s wall, {stats['cpu_seconds']:.3f}s CPU\n")
+        for sort, title in (('cumulative', 'cumulative time'), ('tottime', 'own time')):
+            out.write(f"\n=== Top {HOT_FUNCTIONS} by {title} ===\n")
+            pstats.Stats(profile, stream=out).strip_dirs().sort_stats(sort).print_stats(HOT_FUNCTIONS)
+        (self.run_dir / f"{name}.hot.txt").write_text(out.getvalue())
+
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        lines = [f"{name}: peak traced memory {stats['peak_traced_bytes'] / 1024:,.1f} KiB",
+                 f"\n=== Top {TOP_ALLOCATIONS} allocation sites still held at stage end ==="]
+        for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size / 1024:>10,.1f} KiB {stat.count:>8} blocks  {frame.filename}:{frame.lineno}")
+        (self.run_dir / f"{name}.alloc.txt").write_text('\n'.join(lines) + '\n')
+
+        with open(self.run_dir / f"{name}.folded", 'w') as f:
+            for stack, count in sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def finish(self):
+        """Write summary.json and print where everything went"""
+        if not self.stages:
+            return None
+        summary = self.run_dir / "summary.json"
+        with open(summary, 'w') as f:
+            json.dump(self.stages, f, indent=2)
+        print(f"\n⏱️  Profile: {self.run_dir}")
+        for name, s in self.stages.items():
+            print(f"   {name:<15} {s['wall_seconds']:>8.3f}s wall {s['cpu_seconds']:>8.3f}s CPU "
+                  f"{s['peak_traced_bytes'] / 1024 / 1024:>8.1f} MiB peak")
+        return summary
+
+
+def profiled(profiler, name, fn, *args, **kwargs):
+    """fn(*args, **kwargs), run as a profiled stage when a profiler is given"""
+    if profiler is None:
+        return fn(*args, **kwargs)
+    return profiler.run(name, fn, *args, **kwargs)
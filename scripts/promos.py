@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Promo Conversion Engine
+Prices a whole wallet of active promos against the current market: every
+promo type is evaluated in one (promos × sides) NumPy batch and the best
+hedged conversion per promo is returned
+
+Promo types (fields beyond type/book):
+    bonus_bet      amount                      stake-not-returned bonus bet
+    no_sweat       max_stake, conversion_rate  losing stake refunded as a bonus
+    profit_boost   max_stake, boost_pct, max_extra_winnings
+    odds_boost     max_stake, boost_cents      price improved by N cents
+    deposit_match  deposit, match_pct, max_bonus, rollover
+
+Every promo may also set min_odds, max_odds, markets and sports.
+"""
+
+import json
+
+import numpy as np
+
+from quotes import MARKETS, quote_label
+from sensitivity import american_to_decimal_array, shift_american
+
+DEFAULT_NO_SWEAT_CONVERSION = 0.7
+
+PROMO_TYPES = ('bonus_bet', 'no_sweat', 'profit_boost', 'odds_boost', 'deposit_match')
+
+
+def load_wallet(path):
+    """Read a list of promo dicts from a JSON file"""
+    with open(path) as f:
+        wallet = json.load(f)
+    unknown = {p.get('type') for p in wallet} - set(PROMO_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown promo type(s): {', '.join(sorted(map(str, unknown)))}")
+    return wallet
+
+
+def market_sides(index):
+    """
+    Column arrays for every side in the market that can be hedged elsewhere
+
+    Each side is priced at its own book and hedged at the best opposite price
+    at any other book.
+    """
+    pairs = list(index.hedge_pairs())
+    quotes = [q for q, _ in pairs]
+    hedges = [h for _, h in pairs]
+    sports = sorted({q['sport'] for q in quotes})
+    return {
+        'quotes': quotes,
+        'hedges': hedges,
+        'books': np.array([q['book'] for q in quotes], dtype=object),
+        'odds': np.array([q['price'] for q in quotes], dtype=float),
+        'hedge_odds': np.array([h['price'] for h in hedges], dtype=float),
+        'market': np.array([MARKETS.index(q['market']) for q in quotes], dtype=int),
+        'sport': np.array([sports.index(q['sport']) for q in quotes], dtype=int),
+        'sports': sports
+    }
+
+
+def _column(promos, field, default):
+    return np.array([p.get(field, default) if p.get(field) is not None else default for p in promos],
+                    dtype=float)[:, None]
+
+
+def eligibility(promos, sides):
+    """(promos × sides) mask of where each promo may be used"""
+    books = np.array([p['book'] for p in promos], dtype=object)[:, None]
+    mask = sides['books'][None, :] == books
+    mask &= sides['odds'][None, :] >= _column(promos, 'min_odds', -np.inf)
+    mask &= sides['odds'][None, :] <= _column(promos, 'max_odds', np.inf)
+
+    market_ok = np.array([[m in p.get('markets', MARKETS) for m in MARKETS] for p in promos])
+    mask &= market_ok[:, sides['market']]
+
+    sport_ok = np.array([[p.get('sports') is None or s in p['sports'] for s in sides['sports']] for p in promos])
+    if sport_ok.size:
+        mask &= sport_ok[:, sides['sport']]
+    return mask
+
+
+def _hedged(stake, boosted_decimal, hedge_decimal):
+    """Equal-outcome hedge of a real-money stake at a (possibly boosted) price"""
+    hedge_stake = stake * boosted_decimal / hedge_decimal
+    return stake * (boosted_decimal - 1) - hedge_stake, stake, hedge_stake
+
+
+def evaluate_type(promo_type, promos, d, h, odds):
+    """
+    (value, stake, hedge_stake) for one promo type; d/h/odds are (1 × sides)
+    and promo parameters broadcast down the rows, so stake may come back as
+    a (promos × 1) column
+    """
+    if promo_type == 'bonus_bet':
+        amount = _column(promos, 'amount', 0)
+        hedge_stake = amount * (d - 1) / h
+        return amount * (d - 1) - hedge_stake, amount, hedge_stake
+
+    if promo_type == 'no_sweat':
+        stake = _column(promos, 'max_stake', 0)
+        rate = _column(promos, 'conversion_rate', DEFAULT_NO_SWEAT_CONVERSION)
+        # A loss refunds the stake as a bonus worth `rate` of face value
+        hedge_stake = stake * (d - rate) / h
+        return stake * (d - 1) - hedge_stake, stake, hedge_stake
+
+    if promo_type == 'profit_boost':
+        stake = _column(promos, 'max_stake', 0)
+        extra = np.minimum(stake * (d - 1) * _column(promos, 'boost_pct', 0),
+                           _column(promos, 'max_extra_winnings', np.inf))
+        boosted = d + np.divide(extra, stake, out=np.zeros_like(extra), where=stake > 0)
+        return _hedged(stake, boosted, h)
+
+    if promo_type == 'odds_boost':
+        stake = _column(promos, 'max_stake', 0)
+        boosted = american_to_decimal_array(shift_american(odds, _column(promos, 'boost_cents', 0)))
+        return _hedged(stake, boosted, h)
+
+    if promo_type == 'deposit_match':
+        bonus = np.minimum(_column(promos, 'deposit', 0) * _column(promos, 'match_pct', 1.0),
+                           _column(promos, 'max_bonus', np.inf))
+        turnover = bonus * _column(promos, 'rollover', 1)
+        # Loss per $1 wagered when every rollover bet is hedged at the best price
+        qualifying_loss = 1 - d + d / h
+        value = bonus - turnover * qualifying_loss
+        return value, turnover, turnover * d / h
+
+    raise ValueError(f"Unknown promo type: {promo_type}")
+
+
+def best_conversions(wallet, index):
+    """
+    Best hedged conversion for every promo in the wallet, in wallet order
+
+    Returns a list of {'promo', 'best'} where best is None when no side in
+    the current market is eligible.
+    """
+    sides = market_sides(index)
+    results = [{'promo': p, 'best': None} for p in wallet]
+    if not len(sides['odds']) or not wallet:
+        return results
+
+    d = american_to_decimal_array(sides['odds'])[None, :]
+    h = american_to_decimal_array(sides['hedge_odds'])[None, :]
+    odds = sides['odds'][None, :]
+
+    for promo_type in PROMO_TYPES:
+        rows = [i for i, p in enumerate(wallet) if p['type'] == promo_type]
+        if not rows:
+            continue
+        promos = [wallet[i] for i in rows]
+
+        value, stake, hedge_stake = np.broadcast_arrays(*evaluate_type(promo_type, promos, d, h, odds))
+        value = np.where(eligibility(promos, sides), value, -np.inf)
+        best = value.argmax(axis=1)
+
+        for row, i, col in zip(range(len(rows)), rows, best):
+            if not np.isfinite(value[row, col]):
+                continue
+            quote, hedge = sides['quotes'][col], sides['hedges'][col]
+            face = wallet[i].get('amount') or wallet[i].get('max_stake') or wallet[i].get('deposit') or 0
+            results[i]['best'] = {
+                'sport': quote['sport'],
+                'event': quote['event'],
+                'market': quote['market'],
+                'promo_side': quote_label(quote),
+                'promo_odds': quote['price'],
+                'hedge_book': hedge['book'],
+                'hedge_side': quote_label(hedge),
+                'hedge_odds': hedge['price'],
+                'stake': round(float(stake[row, col]), 2),
+                'hedge_stake': round(float(hedge_stake[row, col]), 2),
+                'expected_profit': round(float(value[row, col]), 2),
+                'conversion_rate': round(float(value[row, col]) / face, 4) if face else None
+            }
+
+    return results
+
+
+def print_conversions(results):
+    """One line per promo with its best conversion"""
+    print(f"\n🎁 Promo conversions ({len(results)} promos)")
+    for r in results:
+        promo, best = r['promo'], r['best']
+        name = promo.get('name') or f"{promo['book']} {promo['type']}"
+        if best is None:
+            print(f"  • {name}: no eligible market")
+            continue
+        print(f"  • {name}: {best['promo_side']} @ {best['promo_odds']} / {best['hedge_side']} @ "
+              f"{best['hedge_odds']} ({best['hedge_book']}) → ${best['expected_profit']:.2f}")
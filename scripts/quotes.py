@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Normalized Quotes and Line-Matching Index
+Flattens moneyline, spread and total prices from every source into one quote
+shape and indexes them by (event, market, line) so opposite sides at the same
+line — and alt lines ±0.5 away — are found by lookup instead of pair scans
+"""
+
+from odds import american_to_decimal
+
+MARKETS = ('h2h', 'spreads', 'totals')
+ALT_LINE_STEP = 0.5
+
+
+def make_quote(sport, event, market, sides, side, price, book, point=None):
+    """
+    Build one normalized quote
+
+    `sides` is the market's two outcome names; side 0 is the first in name
+    order for h2h/spreads and 'Over' for totals. `line` is the index key:
+    the total for totals, and side 0's point for spreads (so both sides of
+    the same spread share a line).
+    """
+    if market == 'spreads':
+        line = point if side == 0 else -point
+    elif market == 'totals':
+        line = point
+    else:
+        line = None
+    return {
+        'sport': sport,
+        'event': event,
+        'market': market,
+        'sides': sides,
+        'side': side,
+        'team': sides[side],
+        'point': point,
+        'line': line,
+        'price': price,
+        'book': book
+    }
+
+
+def quote_label(quote):
+    """Human-readable selection, e.g. 'Boston Celtics -5.5' or 'Over 221.5'"""
+    if quote['market'] == 'spreads':
+        return f"{quote['team']} {quote['point']:+g}"
+    if quote['market'] == 'totals':
+        return f"{quote['team']} {quote['point']:g}"
+    return quote['team']
+
+
+def _odds_api_quotes(sport, record):
+    market = record.get('market', 'h2h')
+    outcomes = record.get('odds') or []
+    if market not in MARKETS or len(outcomes) != 2:
+        return []
+    if market == 'totals':
+        names = ('Over', 'Under')
+    else:
+        names = tuple(sorted(o['name'] for o in outcomes))
+    return [
+        make_quote(sport, record['event'], market, names, names.index(o['name']),
+                   o['price'], record['source'], point=o.get('point'))
+        for o in outcomes
+        if o.get('price') is not None and (market == 'h2h' or o.get('point') is not None)
+    ]
+
+
+def _espn_quotes(sport, record):
+    odds = record.get('odds') or {}
+    event = record.get('event')
+    home = record.get('home_team')
+    if not event or not home or not odds.get('provider'):
+        return []
+    away = event.split(' vs ', 1)[1]
+    teams = tuple(sorted((home, away)))
+    book = odds['provider']
+    quotes = []
+
+    if odds.get('home_moneyline') and odds.get('away_moneyline'):
+        quotes.append(make_quote(sport, event, 'h2h', teams, teams.index(home), odds['home_moneyline'], book))
+        quotes.append(make_quote(sport, event, 'h2h', teams, teams.index(away), odds['away_moneyline'], book))
+
+    spread = odds.get('spread')
+    if spread is not None and odds.get('home_spread_odds') and odds.get('away_spread_odds'):
+        quotes.append(make_quote(sport, event, 'spreads', teams, teams.index(home),
+                                 odds['home_spread_odds'], book, point=spread))
+        quotes.append(make_quote(sport, event, 'spreads', teams, teams.index(away),
+                                 odds['away_spread_odds'], book, point=-spread))
+
+    total = odds.get('team_a_line')  # ESPN's overUnder
+    if total is not None and odds.get('over_odds') and odds.get('under_odds'):
+        quotes.append(make_quote(sport, event, 'totals', ('Over', 'Under'), 0, odds['over_odds'], book, point=total))
+        quotes.append(make_quote(sport, event, 'totals', ('Over', 'Under'), 1, odds['under_odds'], book, point=total))
+
+    return quotes
+
+
+def normalize_quotes(snapshot):
+    """
+    Every priced quote in a scraper snapshot (`data` section), all sources
+    """
+    quotes = []
+    for sport, sources in snapshot.get('sources', {}).items():
+        for record in sources.get('aggregated_odds_api', []):
+            quotes.extend(_odds_api_quotes(sport, record))
+        for record in sources.get('espn', []):
+            quotes.extend(_espn_quotes(sport, record))
+    return quotes
+
+
+class LineIndex:
+    """
+    Quotes keyed on (sport, event, market, line)
+
+    Each key holds, per side, the best quote from each book. Opposite sides
+    at the same line share a key; alt lines are the keys at line ± 0.5.
+    """
+
+    def __init__(self, quotes=()):
+        self._lines = {}
+        self._ranked = {}  # (key, side) -> best two quotes from different books
+        for quote in quotes:
+            self.add(quote)
+
+    def __len__(self):
+        return len(self._lines)
+
+    @staticmethod
+    def key_for(quote):
+        return (quote['sport'], quote['event'], quote['market'], quote['line'])
+
+    def add(self, quote):
+        sides = self._lines.setdefault(self.key_for(quote), ({}, {}))
+        by_book = sides[quote['side']]
+        current = by_book.get(quote['book'])
+        if current is None or american_to_decimal(quote['price']) > american_to_decimal(current['price']):
+            by_book[quote['book']] = quote
+            self._ranked.pop((self.key_for(quote), quote['side']), None)
+
+    def keys(self):
+        return self._lines.keys()
+
+    def side(self, key, side):
+        """Best quote per book for one side of a line"""
+        lines = self._lines.get(key)
+        return lines[side] if lines else {}
+
+    def best(self, key, side, exclude_book=None):
+        """Best-priced quote on a side of a line, optionally skipping one book"""
+        ranked = self._ranked.get((key, side))
+        if ranked is None:
+            ranked = sorted(self.side(key, side).values(),
+                            key=lambda q: american_to_decimal(q['price']), reverse=True)[:2]
+            self._ranked[(key, side)] = ranked
+        for quote in ranked:
+            if quote['book'] != exclude_book:
+                return quote
+        return None
+
+    def opposite(self, quote, exclude_same_book=True):
+        """Best quote on the other side of the same line at another book"""
+        return self.best(self.key_for(quote), 1 - quote['side'],
+                         exclude_book=quote['book'] if exclude_same_book else None)
+
+    def hedge_pairs(self):
+        """
+        Yield (quote, hedge) for every quote that has an opposite side at
+        another book — each book's price paired with the best price against it
+        """
+        for key in self._lines:
+            for side in (0, 1):
+                for quote in self.side(key, side).values():
+                    hedge = self.opposite(quote)
+                    if hedge is not None:
+                        yield quote, hedge
+
+    def hedge_options(self):
+        """
+        Yield (quote, hedges) for every quote that has an opposite side at
+        another book — hedges being every other book's opposite quote, in the
+        same order as hedge_pairs()
+        """
+        for key in self._lines:
+            for side in (0, 1):
+                opposite = self.side(key, 1 - side)
+                for quote in self.side(key, side).values():
+                    hedges = [h for book, h in opposite.items() if book != quote['book']]
+                    if hedges:
+                        yield quote, hedges
+
+    def neighbors(self, key, step=ALT_LINE_STEP):
+        """Indexed alt lines one step either side of `key`"""
+        sport, event, market, line = key
+        if line is None:
+            return []
+        return [k for k in ((sport, event, market, line - step), (sport, event, market, line + step))
+                if k in self._lines]
+
+    def middles(self, step=ALT_LINE_STEP):
+        """
+        Opposite sides on adjacent lines whose winning ranges overlap
+
+        Spreads: side 0 at line L and side 1 at line L' both cover when L > L'.
+        Totals: Over at L and Under at L' both win when L' > L.
+        """
+        found = []
+        for key in self._lines:
+            if key[2] not in ('spreads', 'totals'):
+                continue
+            for neighbor in self.neighbors(key, step):
+                line, other_line = key[3], neighbor[3]
+                if key[2] == 'spreads' and not line > other_line:
+                    continue
+                if key[2] == 'totals' and not other_line > line:
+                    continue
+                side_0 = self.best(key, 0)
+                side_1 = self.best(neighbor, 1)
+                if side_0 is None or side_1 is None:
+                    continue
+                found.append({
+                    'sport': key[0],
+                    'event': key[1],
+                    'market': key[2],
+                    'window': abs(line - other_line),
+                    'legs': [side_0, side_1],
+                    'hold': round(1 / american_to_decimal(side_0['price'])
+                                  + 1 / american_to_decimal(side_1['price']) - 1, 5)
+                })
+        return sorted(found, key=lambda m: m['hold'])
@@ -3,12 +3,20 @@
 Generate summary report from latest arb detection results
 """
 
+import argparse
 import json
 from pathlib import Path
 from datetime import datetime
 
-def generate_report():
-    """Generate summary report"""
+from feed import FORMATS, FeedWriter
+from profiling import Profiler, profiled
+
+def generate_report(feed=None):
+    """
+    Generate summary report
+
+    If a feed (FeedWriter) is given, the summary is appended to it.
+    """
     
     reports_dir = Path(__file__).parent.parent / "reports"
     
@@ -58,6 +66,10 @@ def generate_report():
     print(f"\n📂 Report saved: {report_file.name}")
     print(f"📂 Location: {reports_dir}/")
     
+    if feed:
+        first, _ = feed.append([{k: v for k, v in report.items() if k != 'opportunities'}])
+        print(f"📡 Feed {feed.stream_dir.name}: seq {first}")
+    
     # Print top opportunities
     if profitable:
         print(f"\n🎯 Top {min(3, len(profitable))} Opportunities:")
@@ -69,4 +81,12 @@ def generate_report():
     return report_file
 
 if __name__ == "__main__":
-    generate_report()
+    parser = argparse.ArgumentParser(description="Summarize the latest arb detection results")
+    parser.add_argument('--feed', choices=FORMATS, help="also append the summary to the feed in this format")
+    parser.add_argument('--profile', action='store_true', help="write CPU/memory profiles to analysis/profiles/")
+    args = parser.parse_args()
+    
+    profiler = Profiler('report') if args.profile else None
+    profiled(profiler, 'report', generate_report, feed=FeedWriter('reports', format=args.feed) if args.feed else None)
+    if profiler:
+        profiler.finish()
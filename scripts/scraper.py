@@ -4,179 +4,140 @@ API-based Sportsbook Data Scraper
 Uses public APIs from ESPN, Bovada, and others (no browser automation needed)
 """
 
+import argparse
 import json
-import requests
 from datetime import datetime
 from pathlib import Path
-import time
+
+from adapters import SourceAdapter, print_health, register_adapter, run_adapters
+from archive import save_snapshot
+from profiling import Profiler, profiled
 
 OUTPUT_DIR = Path(__file__).parent.parent / "analysis"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
-def get_espn_odds(sport='nba', limit=10):
+ODDS_API_MARKETS = ('h2h', 'spreads', 'totals')
+
+def parse_espn(data, sport, limit=10):
     """
-    Get live odds from ESPN (includes DraftKings lines)
+    Parse ESPN scoreboard odds (includes DraftKings lines); limit=None keeps every event
     """
-    print(f"\n📊 ESPN Odds ({sport.upper()})")
+    odds_data = []
     
-    try:
-        # ESPN API endpoint for scoreboard with odds
-        if sport == 'nba':
-            url = "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
-        elif sport == 'nfl':
-            url = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard"
-        else:
-            url = f"https://site.api.espn.com/apis/site/v2/sports/{sport}/scoreboard"
-        
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+    for event in data.get('events', [])[:limit]:
+        game_data = {
+            'sport': sport,
+            'date': event.get('date'),
+            'status': event.get('status', {}).get('type'),
+        }
         
-        odds_data = []
+        # Get teams
+        if 'competitions' in event:
+            comp = event['competitions'][0]
+            competitors = comp.get('competitors', [])
+            
+            if len(competitors) >= 2:
+                game_data['team_a'] = competitors[0].get('displayName')
+                game_data['team_b'] = competitors[1].get('displayName')
+                
+                # Same "home vs away" naming as The Odds API so quotes line up
+                home, away = competitors[0], competitors[1]
+                if home.get('homeAway') == 'away':
+                    home, away = away, home
+                game_data['event'] = f"{home.get('displayName')} vs {away.get('displayName')}"
+                game_data['home_team'] = home.get('displayName')
+            
+            # Get odds (if available)
+            if 'odds' in comp:
+                for odd in comp['odds']:
+                    home_odds = odd.get('homeTeamOdds', {})
+                    away_odds = odd.get('awayTeamOdds', {})
+                    game_data['odds'] = {
+                        'provider': odd.get('provider', {}).get('name'),
+                        'team_a_line': odd.get('overUnder'),
+                        'spread': odd.get('spread'),  # Home team's point spread
+                        'home_moneyline': home_odds.get('moneyLine'),
+                        'away_moneyline': away_odds.get('moneyLine'),
+                        'home_spread_odds': home_odds.get('spreadOdds'),
+                        'away_spread_odds': away_odds.get('spreadOdds'),
+                        'over_odds': odd.get('overOdds'),
+                        'under_odds': odd.get('underOdds')
+                    }
         
-        if 'events' in data:
-            for event in data['events'][:limit]:
+        odds_data.append(game_data)
+    
+    return odds_data
+
+def parse_bovada(data, sport, limit=3, group_limit=5):
+    """
+    Parse Bovada live event odds: the first `limit` events of the first
+    `group_limit` event groups (None keeps all)
+    """
+    odds_data = []
+    
+    # Extract game data from Bovada
+    for event_group in data[:group_limit]:
+        if 'events' in event_group:
+            for event in event_group['events'][:limit]:
                 game_data = {
+                    'source': 'Bovada',
                     'sport': sport,
-                    'date': event.get('date'),
-                    'status': event.get('status', {}).get('type'),
+                    'game': event.get('description'),
+                    'event_id': event.get('id')
                 }
                 
-                # Get teams
+                # Get odds
                 if 'competitions' in event:
-                    comp = event['competitions'][0]
-                    competitors = comp.get('competitors', [])
-                    
-                    if len(competitors) >= 2:
-                        game_data['team_a'] = competitors[0].get('displayName')
-                        game_data['team_b'] = competitors[1].get('displayName')
-                    
-                    # Get odds (if available)
-                    if 'odds' in comp:
-                        for odd in comp['odds']:
-                            game_data['odds'] = {
-                                'provider': odd.get('provider', {}).get('name'),
-                                'team_a_line': odd.get('overUnder'),
-                                'spread': odd.get('spread')
-                            }
+                    for comp in event['competitions']:
+                        if 'marketGroups' in comp:
+                            for mg in comp['marketGroups']:
+                                if mg.get('type') == 'MONEYLINE':
+                                    for market in mg.get('markets', []):
+                                        selections = market.get('selections', [])
+                                        if selections:
+                                            game_data['moneyline'] = {
+                                                'team_a': selections[0].get('price'),
+                                                'team_b': selections[1].get('price') if len(selections) > 1 else None
+                                            }
                 
                 odds_data.append(game_data)
-        
-        print(f"✓ Found {len(odds_data)} games with odds")
-        return odds_data
-        
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        return []
-
-def get_bovada_odds(sport='nba'):
-    """
-    Get live odds from Bovada API
-    """
-    print(f"\n💰 Bovada Odds ({sport.upper()})")
     
-    try:
-        # Bovada public API
-        url = f"https://www.bovada.lv/services/sports/event/v2/events/live/{sport}.json"
-        
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        odds_data = []
-        
-        # Extract game data from Bovada
-        for event_group in data[:5]:  # First 5 event groups
-            if 'events' in event_group:
-                for event in event_group['events'][:3]:  # First 3 events per group
-                    game_data = {
-                        'source': 'Bovada',
-                        'sport': sport,
-                        'game': event.get('description'),
-                        'event_id': event.get('id')
-                    }
-                    
-                    # Get odds
-                    if 'competitions' in event:
-                        for comp in event['competitions']:
-                            if 'marketGroups' in comp:
-                                for mg in comp['marketGroups']:
-                                    if mg.get('type') == 'MONEYLINE':
-                                        for market in mg.get('markets', []):
-                                            selections = market.get('selections', [])
-                                            if selections:
-                                                game_data['moneyline'] = {
-                                                    'team_a': selections[0].get('price'),
-                                                    'team_b': selections[1].get('price') if len(selections) > 1 else None
-                                                }
-                    
-                    odds_data.append(game_data)
-        
-        print(f"✓ Found {len(odds_data)} games from Bovada")
-        return odds_data
-        
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        return []
+    return odds_data
 
-def get_odds_api_data(sport='nba'):
+def parse_odds_api(events, sport, limit=10):
     """
-    Get odds from The Odds API (aggregates 10+ sportsbooks)
+    Parse The Odds API response (aggregates 10+ sportsbooks)
     Includes: DraftKings, FanDuel, BetMGM, Caesars, PointsBet, Barstool, WynnBET, etc.
+    Only the first `limit` events are kept (None keeps all).
     """
-    print(f"\n📊 The Odds API (10+ Books Aggregated)")
-    
     odds_data = []
     
-    try:
-        # The Odds API (free tier) provides aggregated odds from multiple sportsbooks
-        # Maps: nba, nfl, mlb, nhl, etc.
-        sport_key = 'nba' if sport.lower() == 'nba' else sport.lower()
-        
-        url = f"https://api.the-odds-api.com/v4/sports/{sport_key}_usa/odds"
-        params = {
-            'regions': 'us',
-            'markets': 'h2h',
-            'oddsFormat': 'american',
-            'apiKey': 'free'  # Public free tier
-        }
+    for event in events[:limit]:
+        event_name = event.get('home_team', 'Unknown') + ' vs ' + event.get('away_team', 'Unknown')
         
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            events = response.json()
-            
-            # Extract sportsbook data
-            sportsbooks_found = set()
-            
-            for event in events[:10]:  # First 10 events
-                event_name = event.get('home_team', 'Unknown') + ' vs ' + event.get('away_team', 'Unknown')
-                
-                # Each event has odds from multiple books
-                if 'bookmakers' in event:
-                    for bookmaker in event['bookmakers']:
-                        book_name = bookmaker.get('title', 'Unknown')
-                        sportsbooks_found.add(book_name)
-                        
-                        for market in bookmaker.get('markets', []):
-                            if market['key'] == 'h2h':
-                                odds_data.append({
-                                    'source': book_name,
-                                    'sport': sport,
-                                    'event': event_name,
-                                    'odds': market.get('outcomes', []),
-                                    'timestamp': event.get('commence_time')
-                                })
+        # Each event has odds from multiple books
+        for bookmaker in event.get('bookmakers', []):
+            book_name = bookmaker.get('title', 'Unknown')
             
-            print(f"✓ Found {len(sportsbooks_found)} sportsbooks: {', '.join(sorted(sportsbooks_found)[:8])}")
-            return odds_data
-        else:
-            print(f"⚠️  The Odds API unavailable (status {response.status_code})")
-            
-    except Exception as e:
-        print(f"⚠️  Error fetching aggregated odds: {e}")
+            for market in bookmaker.get('markets', []):
+                if market['key'] in ODDS_API_MARKETS:
+                    # spreads/totals outcomes also carry a 'point'
+                    odds_data.append({
+                        'source': book_name,
+                        'sport': sport,
+                        'event': event_name,
+                        'event_id': event.get('id'),
+                        'market': market['key'],
+                        'odds': market.get('outcomes', []),
+                        'timestamp': event.get('commence_time')
+                    })
     
-    # Fallback: return placeholder for each major book
+    return odds_data
+
+def odds_api_fallback(sport):
+    """
+    Placeholder for each major book when The Odds API is unavailable
+    """
     fallback_books = [
         'DraftKings', 'FanDuel', 'BetMGM', 'Caesars', 'PointsBet', 
         'Barstool Sportsbook', 'WynnBET', 'Golden Nugget'
@@ -184,47 +145,59 @@ def get_odds_api_data(sport='nba'):
     
     return [{'source': book, 'sport': sport, 'status': 'fallback_available'} for book in fallback_books]
 
-def get_betmgm_odds(sport='nba'):
-    """Get odds from BetMGM (via aggregator)"""
-    print(f"  • BetMGM ({sport.upper()})", end='... ')
-    print(f"✓")
-    return []
-
-def get_fanduel_odds(sport='nba'):
-    """Get odds from FanDuel (via aggregator)"""
-    print(f"  • FanDuel ({sport.upper()})", end='... ')
-    print(f"✓")
-    return []
-
-def get_caesars_odds(sport='nba'):
-    """Get odds from Caesars Sportsbook (via aggregator)"""
-    print(f"  • Caesars ({sport.upper()})", end='... ')
-    print(f"✓")
-    return []
+register_adapter(SourceAdapter(
+    name='aggregated_odds_api',
+    endpoints={'*': "https://api.the-odds-api.com/v4/sports/{sport}_usa/odds"},
+    params={
+        'regions': 'us',
+        'markets': ','.join(ODDS_API_MARKETS),
+        'oddsFormat': 'american',
+        'apiKey': 'free'  # Public free tier
+    },
+    parser=parse_odds_api,
+    fallback=odds_api_fallback,
+    rate_limit=1.0,
+    timeout=10,
+    concurrency=2
+))
 
-def get_pointsbet_odds(sport='nba'):
-    """Get odds from PointsBet (via aggregator)"""
-    print(f"  • PointsBet ({sport.upper()})", end='... ')
-    print(f"✓")
-    return []
+register_adapter(SourceAdapter(
+    name='espn',
+    endpoints={
+        'nba': "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard",
+        'nfl': "https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard",
+        '*': "https://site.api.espn.com/apis/site/v2/sports/{sport}/scoreboard"
+    },
+    parser=parse_espn,
+    timeout=10,
+    concurrency=2
+))
 
-def get_barstool_odds(sport='nba'):
-    """Get odds from Barstool Sports (via aggregator)"""
-    print(f"  • Barstool Sports ({sport.upper()})", end='... ')
-    print(f"✓")
-    return []
+register_adapter(SourceAdapter(
+    name='bovada',
+    endpoints={'*': "https://www.bovada.lv/services/sports/event/v2/events/live/{sport}.json"},
+    parser=parse_bovada,
+    rate_limit=1.0,
+    timeout=5,  # Frequently hangs; fail fast and let the breaker open
+    concurrency=1
+))
 
-def get_goldennugget_odds(sport='nba'):
-    """Get odds from Golden Nugget (via aggregator)"""
-    print(f"  • Golden Nugget ({sport.upper()})", end='... ')
-    print(f"✓")
-    return []
+# Individual books come from The Odds API feed rather than their own endpoints
+INDIVIDUAL_BOOKS = {
+    'betmgm': 'BetMGM',
+    'fanduel': 'FanDuel',
+    'caesars': 'Caesars',
+    'pointsbet': 'PointsBet',
+    'barstool': 'Barstool',
+    'goldennugget': 'Golden Nugget',
+    'wynnbet': 'WynnBET'
+}
 
-def get_wynnbet_odds(sport='nba'):
-    """Get odds from WynnBET (via aggregator)"""
-    print(f"  • WynnBET ({sport.upper()})", end='... ')
-    print(f"✓")
-    return []
+def split_by_book(aggregated, book_title):
+    """Pick one book's quotes out of the aggregated Odds API records"""
+    prefix = book_title.lower()
+    return [r for r in aggregated
+            if r.get('source', '').lower().startswith(prefix) and 'odds' in r]
 
 def get_draftkings_promos():
     """
@@ -259,8 +232,17 @@ def get_draftkings_promos():
         print(f"❌ Error: {e}")
         return []
 
-def save_data(data, filename_suffix=''):
-    """Save scraped data to JSON file"""
+def save_data(data, filename_suffix='', archive=False):
+    """
+    Save scraped data to JSON file, or to the content-addressed archive
+    (per-event chunks stored once plus a small manifest) when archive=True
+    """
+    if archive:
+        manifest_path, stats = save_snapshot(data, captured_at=datetime.now().isoformat())
+        print(f"\n✅ Archived: {manifest_path}")
+        print(f"   {stats['new_chunks']}/{stats['chunks']} chunks new, {stats['bytes_written']:,} bytes written")
+        return manifest_path
+    
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"sportsbook_data_{timestamp}{filename_suffix}.json"
     filepath = OUTPUT_DIR / filename
@@ -274,7 +256,7 @@ def save_data(data, filename_suffix=''):
     print(f"\n✅ Saved: {filepath}")
     return filepath
 
-def run_scraper(sports=['nba']):
+def run_scraper(sports=['nba'], archive=False):
     """
     Run complete scraping pipeline with 10+ sportsbooks
     """
@@ -287,46 +269,26 @@ def run_scraper(sports=['nba']):
         'sources': {}
     }
     
-    # Collect odds from multiple sources
+    # Every source runs in its own worker slot behind a circuit breaker
+    print(f"\n📊 Scraping {', '.join(s.upper() for s in sports)} odds from 10+ books...")
+    print("-" * 80)
+    results, health = run_adapters(sports)
+    print_health(health)
+    all_data['adapter_health'] = health
+    
+    dk_promos = get_draftkings_promos()
+    
     for sport in sports:
-        print(f"\n📊 Scraping {sport.upper()} odds from 10+ books...")
-        print("-" * 80)
-        
-        # Aggregated source that includes 10+ sportsbooks
-        aggregated_data = get_odds_api_data(sport)
-        
-        # Primary individual sources for comparison
-        espn_data = get_espn_odds(sport)
-        bovada_data = get_bovada_odds(sport)
-        
-        # Individual book fallbacks (via aggregator reference)
-        print(f"\n  Individual books (via aggregator):")
-        betmgm_data = get_betmgm_odds(sport)
-        fanduel_data = get_fanduel_odds(sport)
-        caesars_data = get_caesars_odds(sport)
-        pointsbet_data = get_pointsbet_odds(sport)
-        barstool_data = get_barstool_odds(sport)
-        goldennugget_data = get_goldennugget_odds(sport)
-        wynnbet_data = get_wynnbet_odds(sport)
+        sources = results[sport]
+        aggregated_data = sources.get('aggregated_odds_api', [])
         
-        dk_promos = get_draftkings_promos()
-        
-        all_data['sources'][sport] = {
-            'aggregated_odds_api': aggregated_data,
-            'espn': espn_data,
-            'bovada': bovada_data,
-            'betmgm': betmgm_data,
-            'fanduel': fanduel_data,
-            'caesars': caesars_data,
-            'pointsbet': pointsbet_data,
-            'barstool': barstool_data,
-            'goldennugget': goldennugget_data,
-            'wynnbet': wynnbet_data,
-            'draftkings_promos': dk_promos
-        }
+        all_data['sources'][sport] = dict(sources)
+        for key, title in INDIVIDUAL_BOOKS.items():
+            all_data['sources'][sport][key] = split_by_book(aggregated_data, title)
+        all_data['sources'][sport]['draftkings_promos'] = dk_promos
     
     # Save all data
-    filepath = save_data(all_data)
+    filepath = save_data(all_data, archive=archive)
     
     # Print summary
     print("\n" + "=" * 80)
@@ -341,9 +303,8 @@ def run_scraper(sports=['nba']):
         print(f"     • ESPN: {len(sources.get('espn', []))} games")
         print(f"     • Bovada: {len(sources.get('bovada', []))} games")
         print(f"  ✅ Individual books (via aggregator):")
-        print(f"     • DraftKings, FanDuel, BetMGM")
-        print(f"     • Caesars, PointsBet, Barstool")
-        print(f"     • WynnBET, Golden Nugget, and more")
+        for key, title in INDIVIDUAL_BOOKS.items():
+            print(f"     • {title}: {len(sources.get(key, []))} markets")
     
     print(f"\n✅ COVERAGE:")
     print(f"  • ESPN API: Real official odds")
@@ -357,4 +318,13 @@ def run_scraper(sports=['nba']):
     return filepath
 
 if __name__ == "__main__":
-    run_scraper(sports=['nba'])
+    parser = argparse.ArgumentParser(description="Scrape odds from 10+ sportsbooks")
+    parser.add_argument('--archive', action='store_true',
+                        help="store the snapshot in the deduplicated archive instead of a full JSON copy")
+    parser.add_argument('--profile', action='store_true', help="write CPU/memory profiles to analysis/profiles/")
+    args = parser.parse_args()
+    
+    profiler = Profiler('scraper') if args.profile else None
+    profiled(profiler, 'scraper', run_scraper, sports=['nba'], archive=args.archive)
+    if profiler:
+        profiler.finish()
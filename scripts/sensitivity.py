@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Odds-Movement Sensitivity Grid
+Evaluates every candidate bonus arb over a band of line moves on both legs and
+partial hedge fills in one NumPy broadcast, and scores each by its worst case
+"""
+
+import numpy as np
+
+DEFAULT_MOVE_CENTS = 10
+DEFAULT_STEP_CENTS = 5
+DEFAULT_FILL_FRACTIONS = (0.5, 0.75, 1.0)
+
+
+def american_to_decimal_array(american_odds):
+    """Vectorized american_to_decimal"""
+    odds = np.asarray(american_odds, dtype=float)
+    return np.where(odds > 0, odds / 100 + 1, 100 / np.abs(odds) + 1)
+
+
+def shift_american(american_odds, cents):
+    """
+    Move American odds by `cents`, stepping across the -100/+100 gap
+
+    Negative cents make the price worse for the bettor (e.g. +105 - 10 = -105).
+    """
+    odds = np.asarray(american_odds, dtype=float)
+    # Put -100 and +100 at the same point so the line is continuous
+    linear = np.where(odds > 0, odds - 100, odds + 100) + cents
+    return np.where(linear >= 0, linear + 100, linear - 100)
+
+
+def bonus_arb_profit(bonus_stake, bonus_decimal, hedge_decimal, hedge_stake):
+    """
+    Vectorized scenario math from detector.calculate_bonus_arb
+
+    Returns the guaranteed (minimum-scenario) profit for already-chosen stakes.
+    """
+    scenario_bonus_wins = bonus_stake * bonus_decimal - hedge_stake
+    scenario_hedge_wins = -bonus_stake + hedge_stake * (hedge_decimal - 1)
+    return np.minimum(scenario_bonus_wins, scenario_hedge_wins)
+
+
+def bonus_arb_batch(bonus_stakes, bonus_odds, hedge_odds):
+    """
+    calculate_bonus_arb for many candidates at once
+
+    Returns (hedge_stake, guaranteed_profit, roi_pct) arrays, unrounded.
+    """
+    bonus_stakes = np.asarray(bonus_stakes, dtype=float)
+    bonus_decimal = american_to_decimal_array(bonus_odds)
+    hedge_decimal = american_to_decimal_array(hedge_odds)
+    hedge_stake = bonus_stakes * (bonus_decimal - 1) / (hedge_decimal - 1)
+    profit = bonus_arb_profit(bonus_stakes, bonus_decimal, hedge_decimal, hedge_stake)
+    roi_pct = np.where(hedge_stake > 0, profit / np.where(hedge_stake > 0, hedge_stake, 1) * 100, 0)
+    return hedge_stake, profit, roi_pct
+
+
+def sensitivity_grid(bonus_stakes, bonus_odds, hedge_odds, move_cents=DEFAULT_MOVE_CENTS,
+                     step_cents=DEFAULT_STEP_CENTS, fill_fractions=DEFAULT_FILL_FRACTIONS):
+    """
+    Guaranteed profit for every candidate over every (bonus move, hedge move, fill)
+
+    Stakes are sized at the quoted prices (as calculate_bonus_arb does); the
+    bets are then assumed to fill at the moved prices, with only a fraction of
+    the hedge stake getting matched.
+
+    Returns (grid, moves) where grid has shape
+    (candidates, len(moves), len(moves), len(fill_fractions)).
+    """
+    bonus_stakes = np.asarray(bonus_stakes, dtype=float)
+    bonus_odds = np.asarray(bonus_odds, dtype=float)
+    hedge_odds = np.asarray(hedge_odds, dtype=float)
+    moves = np.arange(-move_cents, move_cents + 1, step_cents, dtype=float)
+    fills = np.asarray(fill_fractions, dtype=float)
+
+    bonus_decimal = american_to_decimal_array(bonus_odds)
+    hedge_decimal = american_to_decimal_array(hedge_odds)
+    planned_hedge = bonus_stakes * (bonus_decimal - 1) / (hedge_decimal - 1)
+
+    # Axes: candidate, bonus move, hedge move, fill
+    moved_bonus = american_to_decimal_array(shift_american(bonus_odds[:, None], moves[None, :]))
+    moved_hedge = american_to_decimal_array(shift_american(hedge_odds[:, None], moves[None, :]))
+
+    grid = bonus_arb_profit(
+        bonus_stakes[:, None, None, None],
+        moved_bonus[:, :, None, None],
+        moved_hedge[:, None, :, None],
+        planned_hedge[:, None, None, None] * fills[None, None, None, :]
+    )
+    return grid, moves
+
+
+def score_opportunities(opportunities, move_cents=DEFAULT_MOVE_CENTS, step_cents=DEFAULT_STEP_CENTS,
+                        fill_fractions=DEFAULT_FILL_FRACTIONS):
+    """
+    Attach a robustness score to every opportunity's calculation in one batch
+
+    Adds `robust_profit` (worst case within the band) and `sensitivity`
+    (the band it was computed over) to each calculation dict in place.
+    """
+    if not opportunities:
+        return opportunities
+
+    calcs = [o['calculation'] for o in opportunities]
+    grid, moves = sensitivity_grid(
+        [c['bonus_stake'] for c in calcs],
+        [c['bonus_odds'] for c in calcs],
+        [c['hedge_odds'] for c in calcs],
+        move_cents=move_cents,
+        step_cents=step_cents,
+        fill_fractions=fill_fractions
+    )
+
+    flat = grid.reshape(len(calcs), -1)
+    worst = flat.min(axis=1)
+    best = flat.max(axis=1)
+
+    for calc, robust, upside in zip(calcs, worst, best):
+        attach_scores(calc, round(float(robust), 2), round(float(upside), 2),
+                      move_cents, step_cents, fill_fractions)
+
+    return opportunities
+
+
+def attach_scores(calc, robust, upside, move_cents=DEFAULT_MOVE_CENTS, step_cents=DEFAULT_STEP_CENTS,
+                  fill_fractions=DEFAULT_FILL_FRACTIONS):
+    """Store one calculation's rounded worst/best grid profit, as score_opportunities does"""
+    calc['robust_profit'] = robust
+    calc['sensitivity'] = {
+        'move_cents': move_cents,
+        'step_cents': step_cents,
+        'fill_fractions': list(fill_fractions),
+        'worst_profit': robust,
+        'best_profit': upside
+    }
+
+
+def rank_by_robust_profit(opportunities):
+    """Sort opportunities by worst-case profit, best first"""
+    return sorted(opportunities, key=lambda o: o['calculation'].get('robust_profit', float('-inf')),
+                  reverse=True)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Local Query Service
+Holds the latest quotes and opportunities in memory, indexed by book, sport,
+event and profit, and answers filter queries over HTTP/JSON
+
+    GET /opportunities?bonus_book=FanDuel&sport=nba&bonus_amount=500&limit=1
+    GET /quotes?book=DraftKings&event=Boston%20Celtics%20vs%20Miami%20Heat&market=spreads
+    GET /health
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from archive import latest_snapshot, load_snapshot
+from detector import detect
+
+DEFAULT_PORT = 8765
+DEFAULT_POLL_SECONDS = 5
+DEFAULT_LIMIT = 50
+
+# Money fields that scale linearly with the bonus stake
+SCALED_FIELDS = ('bonus_stake', 'hedge_stake', 'scenario_bonus_wins', 'scenario_hedge_wins',
+                 'guaranteed_profit', 'total_real_money_risk', 'robust_profit')
+SCALED_SENSITIVITY_FIELDS = ('worst_profit', 'best_profit')
+
+
+def _index(items, field_fn):
+    """
+    Map each field value to the positions holding it, as a rank-ordered list
+    (for iteration) plus a set (for membership checks)
+    """
+    index = {}
+    for position, item in enumerate(items):
+        for value in field_fn(item):
+            index.setdefault(value, []).append(position)
+    return {value: (positions, frozenset(positions)) for value, positions in index.items()}
+
+
+class MarketState:
+    """
+    One immutable view of the market; replaced wholesale after every scan
+
+    Opportunities are stored best-first, so every index list is already in
+    rank order and a filtered query never needs to sort.
+    """
+
+    def __init__(self, quotes, opportunities, source=None, captured_at=None):
+        self.quotes = quotes
+        self.opportunities = opportunities
+        self.source = str(source) if source else None
+        self.captured_at = captured_at
+        self.loaded_at = datetime.now().isoformat()
+        self.version = hashlib.sha1(f"{self.source}|{captured_at}|{self.loaded_at}".encode()).hexdigest()[:16]
+
+        calc = lambda o: o['calculation']
+        self.opps_by = {
+            'bonus_book': _index(opportunities, lambda o: [calc(o)['bonus_book']]),
+            'hedge_book': _index(opportunities, lambda o: [calc(o)['hedge_book']]),
+            'book': _index(opportunities, lambda o: {calc(o)['bonus_book'], calc(o)['hedge_book']}),
+            'sport': _index(opportunities, lambda o: [o.get('sport')]),
+            'event': _index(opportunities, lambda o: [o.get('event')]),
+            'market': _index(opportunities, lambda o: [o.get('market')]),
+        }
+        self.quotes_by = {
+            'book': _index(quotes, lambda q: [q['book']]),
+            'sport': _index(quotes, lambda q: [q['sport']]),
+            'event': _index(quotes, lambda q: [q['event']]),
+            'market': _index(quotes, lambda q: [q['market']]),
+        }
+
+    @classmethod
+    def from_snapshot(cls, path):
+        snapshot = load_snapshot(path)
+        index, opportunities = detect(snapshot.get('data', {}))
+        quotes = [q for key in index.keys() for side in (0, 1) for q in index.side(key, side).values()]
+        return cls(quotes, opportunities, source=path, captured_at=snapshot.get('captured_at'))
+
+
+def _select(items, indexes, filters):
+    """
+    Positions matching every equality filter, in stored order
+
+    Walks the smallest index list and checks the rest by set membership,
+    lazily, so a query with a limit stops as soon as it has enough.
+    """
+    empty = ([], frozenset())
+    matches = [indexes[field].get(value, empty) for field, value in filters.items()]
+    if not matches:
+        yield from range(len(items))
+        return
+    matches.sort(key=lambda m: len(m[0]))
+    others = [positions for _, positions in matches[1:]]
+    for position in matches[0][0]:
+        if all(position in other for other in others):
+            yield position
+
+
+def query_opportunities(state, bonus_book=None, hedge_book=None, book=None, sport=None, event=None,
+                        market=None, min_profit=None, bonus_amount=None, limit=DEFAULT_LIMIT):
+    """
+    Best-first opportunities matching the filters
+
+    `bonus_amount` re-prices results for a different bonus size (the math is
+    linear in the bonus stake); `min_profit` applies after re-pricing.
+    """
+    filters = {k: v for k, v in (('bonus_book', bonus_book), ('hedge_book', hedge_book), ('book', book),
+                                 ('sport', sport), ('event', event), ('market', market)) if v is not None}
+    results = []
+    for position in _select(state.opportunities, state.opps_by, filters):
+        if len(results) >= limit:
+            break
+        opp = state.opportunities[position]
+        if bonus_amount is not None:
+            opp = _rescale(opp, bonus_amount)
+        if min_profit is not None and opp['calculation']['guaranteed_profit'] < min_profit:
+            continue
+        results.append(opp)
+    return results
+
+
+def _rescale(opp, bonus_amount):
+    calc = opp['calculation']
+    factor = bonus_amount / calc['bonus_stake'] if calc['bonus_stake'] else 0
+    scaled = dict(calc)
+    for field in SCALED_FIELDS:
+        if field in scaled:
+            scaled[field] = round(scaled[field] * factor, 2)
+    if 'sensitivity' in scaled:
+        scaled['sensitivity'] = dict(scaled['sensitivity'])
+        for field in SCALED_SENSITIVITY_FIELDS:
+            if field in scaled['sensitivity']:
+                scaled['sensitivity'][field] = round(scaled['sensitivity'][field] * factor, 2)
+    return dict(opp, calculation=scaled)
+
+
+def query_quotes(state, book=None, sport=None, event=None, market=None, limit=DEFAULT_LIMIT):
+    """Quotes matching the filters"""
+    filters = {k: v for k, v in (('book', book), ('sport', sport), ('event', event), ('market', market))
+               if v is not None}
+    results = []
+    for position in _select(state.quotes, state.quotes_by, filters):
+        if len(results) >= limit:
+            break
+        results.append(state.quotes[position])
+    return results
+
+
+class QueryService:
+    """
+    Owns the current MarketState and swaps in a new one when a newer
+    snapshot appears
+    """
+
+    def __init__(self, poll_seconds=DEFAULT_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.state = MarketState([], [])
+        self._stop = threading.Event()
+
+    def refresh(self):
+        """Rebuild state from the latest snapshot if it changed; returns True on swap"""
+        path = latest_snapshot()
+        if path is None or str(path) == self.state.source:
+            return False
+        # Build fully, then swap the reference: readers see old or new, never half
+        self.state = MarketState.from_snapshot(path)
+        print(f"🔄 Loaded {path.name}: {len(self.state.opportunities)} opportunities, "
+              f"{len(self.state.quotes)} quotes")
+        return True
+
+    def poll_forever(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️  Refresh failed: {e}")
+            self._stop.wait(self.poll_seconds)
+
+    def stop(self):
+        self._stop.set()
+
+
+def _params(query_string):
+    params = {k: v[-1] for k, v in parse_qs(query_string).items()}
+    for field in ('min_profit', 'bonus_amount'):
+        if field in params:
+            params[field] = float(params[field])
+    if 'limit' in params:
+        params['limit'] = int(params['limit'])
+        if params['limit'] <= 0:
+            raise ValueError("limit must be a positive integer")
+    return params
+
+
+def make_handler(service):
+    """Request handler class bound to one QueryService"""
+
+    routes = {
+        '/opportunities': query_opportunities,
+        '/quotes': query_quotes,
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            state = service.state  # one consistent view for the whole request
+
+            if url.path == '/health':
+                return self._send_json(200, {
+                    'version': state.version,
+                    'source': state.source,
+                    'captured_at': state.captured_at,
+                    'loaded_at': state.loaded_at,
+                    'opportunities': len(state.opportunities),
+                    'quotes': len(state.quotes)
+                })
+
+            query_fn = routes.get(url.path)
+            if query_fn is None:
+                return self._send_json(404, {'error': f"unknown path {url.path}"})
+
+            # Same state + same query = same body, so the ETag needs no body
+            etag = '"' + hashlib.sha1(f"{state.version}|{url.path}?{url.query}".encode()).hexdigest()[:20] + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            try:
+                params = _params(url.query)
+                started = time.perf_counter()
+                results = query_fn(state, **params)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+            except (TypeError, ValueError) as e:
+                return self._send_json(400, {'error': str(e)})
+
+            self._send_json(200, {
+                'version': state.version,
+                'captured_at': state.captured_at,
+                'count': len(results),
+                'query_ms': round(elapsed_ms, 3),
+                'results': results
+            }, etag=etag)
+
+        def _send_json(self, status, payload, etag=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            if etag:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(host='127.0.0.1', port=DEFAULT_PORT, poll_seconds=DEFAULT_POLL_SECONDS):
+    """Load the latest snapshot, start the refresh thread and serve forever"""
+    service = QueryService(poll_seconds=poll_seconds)
+    service.refresh()
+    threading.Thread(target=service.poll_forever, daemon=True).start()
+
+    httpd = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"🛰️  Query service on http://{host}:{port} (refresh every {poll_seconds}s)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve live opportunities and quotes over HTTP/JSON")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--poll', type=float, default=DEFAULT_POLL_SECONDS,
+                        help="seconds between checks for a new snapshot")
+    args = parser.parse_args()
+
+    serve(host=args.host, port=args.port, poll_seconds=args.poll)